@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from flight_data import CACHE_DIR_NAME
+from statistical_analysis import PaperPlaneAnalysis, interpret_eta_squared
+
+DATA_SUFFIXES = ('.csv', '.csv.gz')
+OUTPUT_FORMATS = ('csv', 'json', 'parquet')
+
+
+def find_datasets(input_spec):
+    if os.path.isdir(input_spec):
+        return sorted(os.path.join(input_spec, name) for name in os.listdir(input_spec)
+                      if name.endswith(DATA_SUFFIXES))
+    return sorted(glob.glob(input_spec))
+
+
+def analyze_file(task):
+    data_file, cache_dir = task
+    warnings.filterwarnings('ignore')
+    start = time.perf_counter()
+    file_row = {'file': data_file}
+    try:
+        analysis = PaperPlaneAnalysis(data_file, data_cache_dir=cache_dir)
+        sizes, counts, means, results = analysis.headless_results()
+    except Exception as exc:
+        file_row['error'] = repr(exc)
+        return file_row, []
+
+    anova, corr, ci = results['anova'], results['correlation'], results['confidence_intervals']
+    file_row.update({
+        'n_observations': results['n_observations'],
+        'n_groups': results['n_groups'],
+        'f_statistic': anova['f_statistic'],
+        'anova_p_value': anova['p_value'],
+        'df_between': anova['df_between'],
+        'df_within': anova['df_within'],
+        'eta_squared': results['eta_squared'],
+        'effect_size': interpret_eta_squared(results['eta_squared']),
+        'pearson_r': corr['r'],
+        'pearson_p_value': corr['p_value'],
+        'r_squared': corr['r_squared'],
+        'elapsed_s': time.perf_counter() - start,
+        'error': None
+    })
+    group_rows = [{'file': data_file, 'size_rank': int(size), 'count': int(n), 'mean_m': mean,
+                   'ci_lower_m': lo, 'ci_upper_m': hi}
+                  for size, n, mean, lo, hi in zip(sizes, counts, means, ci['lower'], ci['upper'])]
+    return file_row, group_rows
+
+
+def run_batch(data_files, workers=None, cache_dir=None):
+    file_rows, group_rows = [], []
+    tasks = [(data_file, cache_dir) for data_file in data_files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file_row, rows in pool.map(analyze_file, tasks, chunksize=4):
+            file_rows.append(file_row)
+            group_rows.extend(rows)
+            if file_row.get('error'):
+                print(f"  FAILED {file_row['file']}: {file_row['error']}")
+    groups = pd.DataFrame(group_rows, columns=['file', 'size_rank', 'count', 'mean_m', 'ci_lower_m', 'ci_upper_m'])
+    return pd.DataFrame(file_rows), groups
+
+
+def default_groups_output(output_file):
+    stem, ext = os.path.splitext(output_file[:-3] if output_file.endswith('.gz') else output_file)
+    return f"{stem}_groups{ext}" + ('.gz' if output_file.endswith('.gz') else '')
+
+
+def write_table(table, output_file):
+    fmt = os.path.splitext(output_file[:-3] if output_file.endswith('.gz') else output_file)[1].lstrip('.')
+    if fmt == 'csv':
+        table.to_csv(output_file, index=False)
+    elif fmt == 'json':
+        table.to_json(output_file, orient='records', indent=2)
+    elif fmt == 'parquet':
+        table.to_parquet(output_file, index=False)
+    else:
+        raise ValueError(f"Unsupported output format for {output_file}; use one of {', '.join(OUTPUT_FORMATS)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many flight datasets in parallel without console reports")
+    parser.add_argument("--input", required=True, help="Directory of raw CSV files or a glob pattern")
+    parser.add_argument("--output", default="batch_results.csv",
+                        help="Per-file results table; format from extension (.csv, .json, .parquet)")
+    parser.add_argument("--groups-output", default=None,
+                        help="Per-group results table (default: <output>_groups with the same extension)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Column cache shared by all datasets (default: .flight_cache next to --output)")
+    args = parser.parse_args()
+
+    data_files = find_datasets(args.input)
+    if not data_files:
+        parser.error(f"no datasets found for {args.input}")
+    groups_output = args.groups_output or default_groups_output(args.output)
+    cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.output)), CACHE_DIR_NAME)
+
+    print(f"Analyzing {len(data_files)} datasets...")
+    start = time.perf_counter()
+    files, groups = run_batch(data_files, args.workers, cache_dir)
+    write_table(files, args.output)
+    write_table(groups, groups_output)
+    failed = int(files['error'].notna().sum())
+    print(f"Done in {time.perf_counter() - start:.1f}s ({len(data_files) - failed} ok, {failed} failed)")
+    print(f"Results written to: {args.output}")
+    print(f"Per-group results written to: {groups_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+STAGES = ('collection', 'cleaning', 'analysis', 'plotting')
+DEFAULT_SCALES = ['1000:15', '100000:15', '1000000:1000']
+COLUMNS_DIR = 'columns'
+POLL_SECONDS = 1.0
+
+
+def parse_scale(spec):
+    rows, groups = spec.split(':')
+    rows, groups = int(float(rows)), int(float(groups))
+    if rows < groups:
+        raise argparse.ArgumentTypeError(f"scale {spec}: rows must be at least the number of groups")
+    return rows, groups
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def cpu_seconds():
+    return sum(usage.ru_utime + usage.ru_stime
+               for usage in (resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)))
+
+
+def save_columns(columns, directory):
+    import numpy as np
+    os.makedirs(directory, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(directory, f'{name}.npy'), values)
+
+
+def load_columns(directory):
+    import numpy as np
+    return {name[:-4]: np.load(os.path.join(directory, name), mmap_mode='r')
+            for name in os.listdir(directory) if name.endswith('.npy')}
+
+
+def _stage_collection(data_file, workdir, groups, trials, seed):
+    from data_collection import PaperPlaneDataCollector
+    collector = PaperPlaneDataCollector(n_sizes=groups)
+    columns = load_columns(os.path.join(workdir, COLUMNS_DIR))
+    start = time.perf_counter(), cpu_seconds()
+    collector.add_measurements(columns['size_rank'], columns['trial_number'], columns['distance_m'])
+    collector.export_to_csv(os.path.join(workdir, 'collected.csv'))
+    return start
+
+
+def _stage_cleaning(data_file, workdir, groups, trials, seed):
+    from data_cleaning import process_flight_data
+    start = time.perf_counter(), cpu_seconds()
+    process_flight_data(data_file, os.path.join(workdir, 'processed.csv'), streaming=True)
+    return start
+
+
+def _stage_analysis(data_file, workdir, groups, trials, seed):
+    from statistical_analysis import PaperPlaneAnalysis
+    start = time.perf_counter(), cpu_seconds()
+    PaperPlaneAnalysis(data_file).run_complete_analysis()
+    return start
+
+
+def _stage_plotting(data_file, workdir, groups, trials, seed):
+    import matplotlib
+    matplotlib.use('Agg')
+    from create_visualizations import VisualizationGenerator
+    start = time.perf_counter(), cpu_seconds()
+    VisualizationGenerator(data_file, os.path.join(workdir, 'figures'), force=True).generate_all_plots()
+    return start
+
+
+def _run_stage(stage, data_file, workdir, groups, trials, seed, queue):
+    runner = globals()[f'_stage_{stage}']
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            wall_start, cpu_start = runner(data_file, workdir, groups, trials, seed)
+            wall, cpu = time.perf_counter() - wall_start, cpu_seconds() - cpu_start
+        queue.put({'wall_s': wall, 'cpu_s': cpu, 'peak_rss_mb': peak_rss_mb(), 'error': None})
+    except Exception as exc:
+        queue.put({'wall_s': None, 'cpu_s': None, 'peak_rss_mb': peak_rss_mb(), 'error': repr(exc)})
+
+
+def run_stage(stage, data_file, workdir, groups, trials, seed):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_stage, args=(stage, data_file, workdir, groups, trials, seed, queue))
+    proc.start()
+    while True:
+        try:
+            result = queue.get(timeout=POLL_SECONDS)
+            break
+        except queue_module.Empty:
+            if proc.is_alive():
+                continue
+            proc.join()
+            try:
+                result = queue.get(timeout=POLL_SECONDS)
+            except queue_module.Empty:
+                result = {'wall_s': None, 'cpu_s': None, 'peak_rss_mb': None,
+                          'error': f"stage process exited with code {proc.exitcode} before reporting"}
+            break
+    proc.join()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales, stages=STAGES, workdir='benchmark_work', seed=0, keep_files=False):
+    from data_collection import PaperPlaneDataCollector
+    from flight_data import CACHE_DIR_NAME
+
+    results = []
+    for rows, groups in scales:
+        trials = max(1, rows // groups)
+        rows = trials * groups
+        scale_dir = os.path.join(workdir, f'{rows}_{groups}')
+        os.makedirs(scale_dir, exist_ok=True)
+        data_file = os.path.join(scale_dir, 'raw_flight_data.csv')
+
+        print(f"\n--- {rows} rows, {groups} size groups ---")
+        collector = PaperPlaneDataCollector()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            columns = collector.simulate_experiment(groups, trials, seed=seed)
+            collector.export_experiment_csv(columns, data_file)
+        save_columns(columns, os.path.join(scale_dir, COLUMNS_DIR))
+        del columns
+
+        for stage in stages:
+            shutil.rmtree(os.path.join(scale_dir, CACHE_DIR_NAME), ignore_errors=True)
+            result = {'stage': stage, 'rows': rows, 'groups': groups}
+            result.update(run_stage(stage, data_file, scale_dir, groups, trials, seed))
+            result['rows_per_s'] = rows / result['wall_s'] if result['wall_s'] else None
+            results.append(result)
+            if result['error']:
+                print(f"  {stage:<11} FAILED: {result['error']}")
+            else:
+                print(f"  {stage:<11} wall {result['wall_s']:>9.3f}s  cpu {result['cpu_s']:>9.3f}s  "
+                      f"peak RSS {result['peak_rss_mb']:>8.1f}MB  {result['rows_per_s']:>12.0f} rows/s")
+
+        if not keep_files:
+            shutil.rmtree(scale_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collection, cleaning, analysis and plotting at increasing scale")
+    parser.add_argument("--scales", nargs='+', type=parse_scale, default=[parse_scale(s) for s in DEFAULT_SCALES],
+                        help="Dataset scales as ROWS:GROUPS, e.g. 1e3:15 1e7:10000")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=list(STAGES), help="Stages to benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="Machine-readable results file (JSON)")
+    parser.add_argument("--workdir", default="benchmark_work", help="Scratch directory for generated datasets")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic datasets")
+    parser.add_argument("--keep-files", action="store_true", help="Keep generated datasets and outputs")
+    args = parser.parse_args()
+
+    print("=== Paper Plane Pipeline Benchmark ===")
+    results = run_benchmarks(args.scales, args.stages, args.workdir, args.seed, args.keep_files)
+
+    report = {
+        'revision': git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
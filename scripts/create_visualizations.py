@@ -1,44 +1,159 @@
 #!/usr/bin/env python3
-import pandas as pd
+import argparse
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import multiprocessing
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from data_cleaning import load_aggregates
+from flight_data import PLOT_COLUMNS, load_flight_data
+from instrumentation import instrument_methods
+from statistical_analysis import KEY_COMPARISONS, FlightStatistics, GroupSummary
 
 sns.set_style("whitegrid")
 sns.set_palette("husl")
 
+PLOT_METHODS = [
+    'plot_mean_by_size',
+    'plot_trend_line',
+    'plot_scatter_correlation',
+    'plot_boxplot',
+    'plot_confidence_intervals',
+    'plot_variance_comparison',
+    'plot_individual_trials',
+    'plot_effect_size_visualization',
+    'plot_pairwise_comparisons',
+    'plot_size_dimensions',
+]
+RAW_DATA_PLOTS = ('plot_individual_trials',)
+
+FIGURE_FILES = {
+    'plot_mean_by_size': '01_mean_distance_by_size.png',
+    'plot_trend_line': '02_distance_trend.png',
+    'plot_scatter_correlation': '03_scatter_correlation.png',
+    'plot_boxplot': '04_boxplot_distribution.png',
+    'plot_confidence_intervals': '05_confidence_intervals.png',
+    'plot_variance_comparison': '06_variance_comparison.png',
+    'plot_individual_trials': '07_individual_trials.png',
+    'plot_effect_size_visualization': '08_effect_size.png',
+    'plot_pairwise_comparisons': '09_pairwise_comparisons.png',
+    'plot_size_dimensions': '10_size_dimensions.png',
+}
+
+FIGURE_DESCRIPTIONS = {
+    'plot_mean_by_size': 'Bar chart: Mean distance by size',
+    'plot_trend_line': 'Line plot: Distance trend',
+    'plot_scatter_correlation': 'Scatter plot: Correlation analysis',
+    'plot_boxplot': 'Box plot: Distribution by size',
+    'plot_confidence_intervals': 'Error bars: Confidence intervals',
+    'plot_variance_comparison': 'Comparison: Mean vs. variability',
+    'plot_individual_trials': 'Scatter: Individual trial results',
+    'plot_effect_size_visualization': 'Pie chart: Effect size (variance explained)',
+    'plot_pairwise_comparisons': 'Bar chart: Pairwise comparisons',
+    'plot_size_dimensions': 'Line plot: Size dimensions',
+}
+
+FIGURE_INPUTS = {
+    'plot_mean_by_size': lambda gen: (gen.stats.sizes, gen.stats.means, gen.stats.std),
+    'plot_trend_line': lambda gen: (gen.stats.sizes, gen.stats.means),
+    'plot_scatter_correlation': lambda gen: (gen.stats.sizes, gen.stats.means),
+    'plot_boxplot': lambda gen: (gen.stats.box_stats,),
+    'plot_confidence_intervals': lambda gen: (gen.stats.sizes, gen.stats.means, *gen.stats.confidence_intervals[:2]),
+    'plot_variance_comparison': lambda gen: (gen.stats.sizes, gen.stats.means, gen.stats.std),
+    'plot_individual_trials': lambda gen: (gen.stats.sizes, gen.stats.index.offsets, gen.stats.index.distances,
+                                           gen.stats.means, gen.seed, gen.density_threshold, DENSITY_RESOLUTION),
+    'plot_effect_size_visualization': lambda gen: (gen.stats.eta_squared,),
+    'plot_pairwise_comparisons': lambda gen: (KEY_COMPARISONS, [gen.stats.pair_test(a, b) for a, b in KEY_COMPARISONS]),
+    'plot_size_dimensions': lambda gen: (gen.stats.dimensions.index.values, gen.stats.dimensions.to_numpy()),
+}
+
+PLOT_STATISTICS = ('std', 'trend', 'box_stats', 'confidence_intervals', '_anova', 'dimensions')
+
+MANIFEST_NAME = '.figure_manifest.json'
+DENSITY_THRESHOLD = 20000
+DENSITY_RESOLUTION = (1400, 400)
+
+_PLOT_GENERATOR = None
+
+
+def content_hash(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype}{part.shape}".encode('utf-8'))
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode('utf-8'))
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def _init_plot_worker(generator):
+    global _PLOT_GENERATOR
+    plt.switch_backend('Agg')
+    if generator is not None:
+        _PLOT_GENERATOR = generator
+
+
+def _render_plot(method):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        getattr(_PLOT_GENERATOR, method)()
+    return output.getvalue()
+
+
 class VisualizationGenerator:
-    def __init__(self, data_file, output_dir):
+    def __init__(self, data_file, output_dir, workers=None, seed=0, force=False, density_threshold=DENSITY_THRESHOLD,
+                 stats=None, aggregates_file=None):
         self.data_file = data_file
+        self.aggregates_file = aggregates_file
         self.output_dir = output_dir
+        self.workers = workers
+        self.seed = seed
+        self.force = force
+        self.density_threshold = density_threshold
         self.df = None
+        self.stats = stats
         
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
     def load_data(self):
-        print("Loading data...")
-        self.df = pd.read_csv(self.data_file)
-        print(f"Loaded {len(self.df)} observations")
+        if self.stats is None and self.aggregates_file:
+            print("Loading aggregates...")
+            self.stats = FlightStatistics(GroupSummary(load_aggregates(self.aggregates_file)))
+        elif self.stats is None:
+            print("Loading data...")
+            self.df = load_flight_data(self.data_file, PLOT_COLUMNS)
+            self.stats = FlightStatistics.from_frame(self.df)
+        else:
+            print("Using precomputed statistics...")
+            self.df = self.stats.frame
+        print(f"Loaded {int(self.stats.counts.sum())} observations")
         
     def plot_mean_by_size(self):
         print("\n1. Creating bar chart: Mean distance by size...")
         
-        grouped = self.df.groupby('size_rank')['distance_m'].agg(['mean', 'std'])
-        
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        x = grouped.index
-        y = grouped['mean']
-        yerr = grouped['std']
+        x = self.stats.sizes
+        y = self.stats.means
+        yerr = self.stats.std
         
         bars = ax.bar(x, y, color='steelblue', alpha=0.8, edgecolor='black', linewidth=1.2)
         ax.errorbar(x, y, yerr=yerr, fmt='none', ecolor='black', capsize=5, alpha=0.6)
         
         for i, (idx, val) in enumerate(zip(x, y)):
-            ax.text(idx, val + yerr.iloc[i] + 0.3, f'{val:.2f}', 
+            ax.text(idx, val + yerr[i] + 0.3, f'{val:.2f}', 
                    ha='center', va='bottom', fontsize=9, fontweight='bold')
         
         ax.set_xlabel('Paper Plane Size Rank (1=Largest, 15=Smallest)', fontsize=12, fontweight='bold')
@@ -55,17 +170,15 @@ class VisualizationGenerator:
     def plot_trend_line(self):
         print("\n2. Creating line plot: Distance trend with regression...")
         
-        grouped = self.df.groupby('size_rank')['distance_m'].mean()
-        
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        x = grouped.index.values
-        y = grouped.values
+        x = self.stats.sizes
+        y = self.stats.means
         
         ax.plot(x, y, marker='o', linewidth=2.5, markersize=10, 
                color='darkblue', label='Observed Mean', markeredgecolor='black', markeredgewidth=1)
         
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+        slope, intercept, r_value, p_value, std_err = self.stats.trend
         line = slope * x + intercept
         ax.plot(x, line, '--', color='red', linewidth=2, alpha=0.7, 
                label=f'Linear Fit (R²={r_value**2:.3f})')
@@ -85,17 +198,15 @@ class VisualizationGenerator:
     def plot_scatter_correlation(self):
         print("\n3. Creating scatter plot: Correlation analysis...")
         
-        grouped = self.df.groupby('size_rank')['distance_m'].mean()
-        
         fig, ax = plt.subplots(figsize=(10, 8))
         
-        x = grouped.index.values
-        y = grouped.values
+        x = self.stats.sizes
+        y = self.stats.means
         
         ax.scatter(x, y, s=200, alpha=0.7, c=range(len(x)), cmap='viridis', 
                   edgecolors='black', linewidth=2)
         
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+        slope, intercept, r_value, p_value, std_err = self.stats.trend
         line = slope * x + intercept
         ax.plot(x, line, 'r--', linewidth=2.5, alpha=0.8, label='Regression Line')
         
@@ -119,11 +230,8 @@ class VisualizationGenerator:
         
         fig, ax = plt.subplots(figsize=(14, 6))
         
-        sizes = sorted(self.df['size_rank'].unique())
-        data_to_plot = [self.df[self.df['size_rank']==size]['distance_m'].values for size in sizes]
-        
-        bp = ax.boxplot(data_to_plot, labels=sizes, patch_artist=True,
-                       notch=True, showmeans=True,
+        bp = ax.bxp(self.stats.box_stats, patch_artist=True,
+                       shownotches=True, showmeans=True,
                        boxprops=dict(facecolor='lightblue', alpha=0.7),
                        medianprops=dict(color='red', linewidth=2),
                        meanprops=dict(marker='D', markerfacecolor='green', markersize=6),
@@ -148,23 +256,9 @@ class VisualizationGenerator:
         
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        sizes = sorted(self.df['size_rank'].unique())
-        means = []
-        ci_lower = []
-        ci_upper = []
-        
-        for size in sizes:
-            data = self.df[self.df['size_rank']==size]['distance_m']
-            mean = data.mean()
-            se = stats.sem(data)
-            ci = stats.t.interval(0.95, len(data)-1, loc=mean, scale=se)
-            means.append(mean)
-            ci_lower.append(ci[0])
-            ci_upper.append(ci[1])
-        
-        means = np.array(means)
-        ci_lower = np.array(ci_lower)
-        ci_upper = np.array(ci_upper)
+        sizes = self.stats.sizes
+        means = self.stats.means
+        ci_lower, ci_upper, _ = self.stats.confidence_intervals
         
         ax.errorbar(sizes, means, yerr=[means-ci_lower, ci_upper-means],
                    fmt='o', markersize=8, capsize=5, capthick=2,
@@ -187,20 +281,18 @@ class VisualizationGenerator:
     def plot_variance_comparison(self):
         print("\n6. Creating variance comparison plot...")
         
-        grouped = self.df.groupby('size_rank')['distance_m'].agg(['mean', 'std'])
-        
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
         
-        x = grouped.index
+        x = self.stats.sizes
         
-        ax1.bar(x, grouped['mean'], color='steelblue', alpha=0.7, edgecolor='black')
+        ax1.bar(x, self.stats.means, color='steelblue', alpha=0.7, edgecolor='black')
         ax1.set_xlabel('Size Rank', fontsize=11, fontweight='bold')
         ax1.set_ylabel('Mean Distance (m)', fontsize=11, fontweight='bold')
         ax1.set_title('Mean Flight Distance', fontsize=12, fontweight='bold')
         ax1.grid(axis='y', alpha=0.3)
         ax1.set_xticks(x)
         
-        ax2.bar(x, grouped['std'], color='coral', alpha=0.7, edgecolor='black')
+        ax2.bar(x, self.stats.std, color='coral', alpha=0.7, edgecolor='black')
         ax2.set_xlabel('Size Rank', fontsize=11, fontweight='bold')
         ax2.set_ylabel('Standard Deviation (m)', fontsize=11, fontweight='bold')
         ax2.set_title('Variability in Flight Distance', fontsize=12, fontweight='bold')
@@ -218,23 +310,47 @@ class VisualizationGenerator:
         
         fig, ax = plt.subplots(figsize=(14, 6))
         
-        sizes = sorted(self.df['size_rank'].unique())
-        
-        for size in sizes:
-            data = self.df[self.df['size_rank']==size]['distance_m']
-            x_jitter = np.random.normal(size, 0.1, len(data))
-            ax.scatter(x_jitter, data, alpha=0.5, s=50, edgecolors='black', linewidth=0.5)
+        sizes = self.stats.sizes
+        index = self.stats.index
+        
+        if len(index.distances) <= self.density_threshold:
+            rng = np.random.default_rng(self.seed)
+            for size, data in zip(sizes, index.groups()):
+                x_jitter = rng.normal(size, 0.1, len(data))
+                ax.scatter(x_jitter, data, alpha=0.5, s=50, edgecolors='black', linewidth=0.5)
+            title = 'All Individual Trial Results'
+        else:
+            nx, ny = DENSITY_RESOLUTION
+            y_lo, y_hi = index.distances.min(), index.distances.max()
+            y_bins = np.clip(((index.distances - y_lo) / ((y_hi - y_lo) or 1.0) * ny).astype(np.int64), 0, ny - 1)
+            density = np.bincount(index.group_ids() * ny + y_bins, minlength=len(sizes) * ny)
+            density = density.reshape(len(sizes), ny).astype(np.float64)
+            density /= np.maximum(density.max(axis=1, keepdims=True), 1.0)
+            
+            x_lo, x_hi = sizes[0] - 0.5, sizes[-1] + 0.5
+            centers = x_lo + (np.arange(nx) + 0.5) * (x_hi - x_lo) / nx
+            right = np.clip(np.searchsorted(sizes, centers), 0, len(sizes) - 1)
+            left = np.maximum(right - 1, 0)
+            nearest = np.where(centers - sizes[left] < sizes[right] - centers, left, right)
+            raster = density[nearest].T
+            raster[:, np.abs(centers - sizes[nearest]) > 0.4] = np.nan
+            raster[raster == 0] = np.nan
+            
+            image = ax.imshow(raster, origin='lower', aspect='auto', cmap='viridis', interpolation='nearest',
+                              extent=(x_lo, x_hi, y_lo, y_hi))
+            fig.colorbar(image, ax=ax, pad=0.01, label='Relative density within size')
+            title = f'All Individual Trial Results (density of {len(index.distances):,} throws)'
         
-        means = self.df.groupby('size_rank')['distance_m'].mean()
-        ax.plot(means.index, means.values, 'r-', linewidth=3, marker='D', 
-               markersize=10, label='Group Mean', zorder=10)
+        ax.plot(sizes, self.stats.means, 'r-', linewidth=3 if len(sizes) <= 50 else 1.5,
+               marker='D' if len(sizes) <= 50 else None, markersize=10, label='Group Mean', zorder=10)
         
         ax.set_xlabel('Paper Plane Size Rank', fontsize=12, fontweight='bold')
         ax.set_ylabel('Flight Distance (meters)', fontsize=12, fontweight='bold')
-        ax.set_title('All Individual Trial Results', fontsize=14, fontweight='bold', pad=20)
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         ax.legend(fontsize=11)
         ax.grid(True, alpha=0.3)
-        ax.set_xticks(sizes)
+        if len(sizes) <= 50:
+            ax.set_xticks(sizes)
         
         plt.tight_layout()
         plt.savefig(f'{self.output_dir}/07_individual_trials.png', dpi=300, bbox_inches='tight')
@@ -244,12 +360,7 @@ class VisualizationGenerator:
     def plot_effect_size_visualization(self):
         print("\n8. Creating effect size visualization...")
         
-        grouped = self.df.groupby('size_rank')['distance_m']
-        grand_mean = self.df['distance_m'].mean()
-        
-        ss_between = sum(grouped.count() * (grouped.mean() - grand_mean)**2)
-        ss_total = sum((self.df['distance_m'] - grand_mean)**2)
-        eta_squared = ss_between / ss_total
+        eta_squared = self.stats.eta_squared
         
         fig, ax = plt.subplots(figsize=(10, 6))
         
@@ -278,7 +389,7 @@ class VisualizationGenerator:
     def plot_pairwise_comparisons(self):
         print("\n9. Creating pairwise comparison plot...")
         
-        comparisons = [(1, 2), (5, 6), (1, 6), (14, 15), (1, 15)]
+        comparisons = KEY_COMPARISONS
         
         fig, ax = plt.subplots(figsize=(12, 6))
         
@@ -287,11 +398,7 @@ class VisualizationGenerator:
         colors_list = []
         
         for size1, size2 in comparisons:
-            group1 = self.df[self.df['size_rank']==size1]['distance_m']
-            group2 = self.df[self.df['size_rank']==size2]['distance_m']
-            
-            t_stat, p_value = stats.ttest_ind(group1, group2)
-            mean_diff = group1.mean() - group2.mean()
+            t_stat, p_value, mean_diff = self.stats.pair_test(size1, size2)
             mean_diffs.append(mean_diff)
             
             colors_list.append('green' if p_value < 0.05 else 'gray')
@@ -320,18 +427,11 @@ class VisualizationGenerator:
     def plot_size_dimensions(self):
         print("\n10. Creating size dimensions visualization...")
         
-        sizes = sorted(self.df['size_rank'].unique())
-        widths = []
-        heights = []
-        areas = []
-        
-        for size in sizes:
-            width = self.df[self.df['size_rank']==size]['width_cm'].iloc[0]
-            height = self.df[self.df['size_rank']==size]['height_cm'].iloc[0]
-            area = self.df[self.df['size_rank']==size]['area_cm2'].iloc[0]
-            widths.append(width)
-            heights.append(height)
-            areas.append(area)
+        dimensions = self.stats.dimensions
+        sizes = dimensions.index.values
+        widths = dimensions['width_cm'].values
+        heights = dimensions['height_cm'].values
+        areas = dimensions['area_cm2'].values
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
         
@@ -357,6 +457,48 @@ class VisualizationGenerator:
         plt.close()
         print(f"   Saved: 10_size_dimensions.png")
         
+    def render_parallel(self, methods, workers):
+        global _PLOT_GENERATOR
+        if sys.platform.startswith('linux'):
+            _PLOT_GENERATOR = self
+            context, initargs = multiprocessing.get_context('fork'), (None,)
+        else:
+            context, initargs = multiprocessing.get_context(), (self,)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_plot_worker, initargs=initargs) as pool:
+                for output in pool.map(_render_plot, methods):
+                    print(output, end='')
+        finally:
+            _PLOT_GENERATOR = None
+        
+    def figure_hash(self, method):
+        source = inspect.getsource(inspect.unwrap(getattr(VisualizationGenerator, method)))
+        return content_hash(matplotlib.__version__, source, *FIGURE_INPUTS[method](self))
+        
+    def read_manifest(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+    def write_manifest(self, manifest):
+        path = os.path.join(self.output_dir, MANIFEST_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+        
+    def plot_methods(self):
+        if isinstance(self.stats.index, GroupSummary):
+            return [method for method in PLOT_METHODS if method not in RAW_DATA_PLOTS]
+        return list(PLOT_METHODS)
+        
+    def stale_figures(self, manifest, hashes):
+        return [method for method in hashes
+                if self.force or manifest.get(FIGURE_FILES[method]) != hashes[method]
+                or not os.path.exists(os.path.join(self.output_dir, FIGURE_FILES[method]))]
+        
     def generate_all_plots(self):
         print("="*80)
         print("GENERATING VISUALIZATIONS FOR PRESENTATION")
@@ -364,38 +506,54 @@ class VisualizationGenerator:
         
         self.load_data()
         
-        self.plot_mean_by_size()
-        self.plot_trend_line()
-        self.plot_scatter_correlation()
-        self.plot_boxplot()
-        self.plot_confidence_intervals()
-        self.plot_variance_comparison()
-        self.plot_individual_trials()
-        self.plot_effect_size_visualization()
-        self.plot_pairwise_comparisons()
-        self.plot_size_dimensions()
+        manifest = self.read_manifest()
+        available = self.plot_methods()
+        hashes = {method: self.figure_hash(method) for method in available}
+        methods = self.stale_figures(manifest, hashes)
+        for method in PLOT_METHODS:
+            if method not in available:
+                print(f"\n   Skipped: {FIGURE_FILES[method]} needs the raw observations")
+            elif method not in methods:
+                print(f"\n   Unchanged: {FIGURE_FILES[method]}")
+        
+        workers = min(self.workers or os.cpu_count() or 1, len(methods))
+        self.stats.precompute(*PLOT_STATISTICS)
+        if workers <= 1:
+            for method in methods:
+                getattr(self, method)()
+        else:
+            self.render_parallel(methods, workers)
+        manifest.update({FIGURE_FILES[method]: hashes[method] for method in methods})
+        self.write_manifest(manifest)
         
         print("\n" + "="*80)
         print(f"ALL VISUALIZATIONS SAVED TO: {self.output_dir}/")
         print("="*80)
-        print("\nGenerated 10 figures:")
-        print("  01 - Bar chart: Mean distance by size")
-        print("  02 - Line plot: Distance trend")
-        print("  03 - Scatter plot: Correlation analysis")
-        print("  04 - Box plot: Distribution by size")
-        print("  05 - Error bars: Confidence intervals")
-        print("  06 - Comparison: Mean vs. variability")
-        print("  07 - Scatter: Individual trial results")
-        print("  08 - Pie chart: Effect size (variance explained)")
-        print("  09 - Bar chart: Pairwise comparisons")
-        print("  10 - Line plot: Size dimensions")
+        print(f"\nGenerated {len(available)} figures ({len(methods)} re-rendered):")
+        for method in available:
+            print(f"  {FIGURE_FILES[method][:2]} - {FIGURE_DESCRIPTIONS[method]}")
+
+
+instrument_methods(VisualizationGenerator, ['load_data', 'generate_all_plots'] +
+                   [name for name in vars(VisualizationGenerator) if name.startswith('plot_')],
+                   rows=lambda args, result: int(args[0].stats.counts.sum()) if args[0].stats is not None else None)
 
 
 def main():
-    data_file = "../Data/raw_flight_data.csv"
-    output_dir = "../Figures"
+    parser = argparse.ArgumentParser(description="Generate presentation figures for the paper plane experiment")
+    parser.add_argument("--data", default="../Data/raw_flight_data.csv", help="Raw long-format CSV")
+    parser.add_argument("--output", default="../Figures", help="Output directory for figures")
+    parser.add_argument("--workers", type=int, default=None, help="Figure rendering processes (1 renders serially)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the jitter in the individual trials plot")
+    parser.add_argument("--force", action="store_true", help="Re-render every figure even if its inputs are unchanged")
+    parser.add_argument("--density-threshold", type=int, default=DENSITY_THRESHOLD,
+                        help="Draw the individual trials plot as density strips above this many throws")
+    parser.add_argument("--aggregates", default=None,
+                        help="Plot from per-size aggregates (JSON from data_cleaning.py --aggregates-output) instead of --data")
+    args = parser.parse_args()
     
-    viz = VisualizationGenerator(data_file, output_dir)
+    viz = VisualizationGenerator(args.data, args.output, workers=args.workers, seed=args.seed, force=args.force,
+                                 density_threshold=args.density_threshold, aggregates_file=args.aggregates)
     viz.generate_all_plots()
 
 
@@ -1,19 +1,542 @@
 #!/usr/bin/env python3
+import argparse
 import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
 import statistics
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-def process_flight_data(input_file, output_file):
+import numpy as np
+import pandas as pd
+
+from flight_format import BINARY_SUFFIX, RAW_SUFFIXES, open_raw_rows
+from instrumentation import instrument, set_rows
+from quantile_sketch import QuantileSketch
+
+BASE_FIELDS = ['size_rank', 'width_cm', 'height_cm', 'area_cm2', 'mean_m']
+STREAM_FIELDS = BASE_FIELDS + ['n_trials', 'std_m', 'min_m', 'max_m']
+TRIAL_FIELDS = ['size_rank', 'trial_number', 'distance_m']
+AGGREGATE_COLUMNS = ['size_rank', 'width_cm', 'height_cm', 'area_cm2', 'distance_m']
+SKETCH_BATCH = 4096
+WATERMARK_WINDOW = 1 << 16
+
+
+class SizeAggregate:
+    __slots__ = ('width_cm', 'height_cm', 'area_cm2', 'count', 'mean', 'm2', 'min', 'max', 'sketch', 'pending', 'rng')
+
+    def __init__(self, width_cm, height_cm, area_cm2):
+        self.width_cm = width_cm
+        self.height_cm = height_cm
+        self.area_cm2 = area_cm2
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = None
+        self.pending = []
+        self.rng = None
+
+    def track_quantiles(self, rng=None):
+        self.sketch = QuantileSketch()
+        self.rng = rng
+        return self
+
+    def flush(self):
+        if self.pending:
+            self.sketch.add_many(self.pending, self.rng)
+            self.pending = []
+        return self
+
+    def add(self, distance):
+        self.count += 1
+        delta = distance - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (distance - self.mean)
+        if distance < self.min:
+            self.min = distance
+        if distance > self.max:
+            self.max = distance
+        if self.sketch is not None:
+            self.pending.append(distance)
+            if len(self.pending) >= SKETCH_BATCH:
+                self.flush()
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.flush()
+        other.flush()
+        if self.count == 0:
+            self.width_cm, self.height_cm, self.area_cm2 = other.width_cm, other.height_cm, other.area_cm2
+            self.sketch = other.sketch.copy() if other.sketch is not None else None
+        elif self.sketch is not None:
+            self.sketch = self.sketch.merge(other.sketch) if other.sketch is not None else None
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def total(self):
+        return self.mean * self.count
+
+    @property
+    def sum_sq(self):
+        return self.m2 + self.count * self.mean * self.mean
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_state(self):
+        state = [self.width_cm, self.height_cm, self.area_cm2,
+                 self.count, self.mean, self.m2, self.min, self.max]
+        if self.sketch is not None:
+            state.append(self.flush().sketch.to_state())
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls(state[0], state[1], state[2])
+        agg.count, agg.mean, agg.m2, agg.min, agg.max = state[3:8]
+        if len(state) > 8:
+            agg.sketch = QuantileSketch.from_state(state[8])
+        return agg
+
+    def to_row(self, size_rank):
+        return {
+            'size_rank': size_rank,
+            'width_cm': self.width_cm,
+            'height_cm': self.height_cm,
+            'area_cm2': self.area_cm2,
+            'mean_m': round(self.mean, 2),
+            'n_trials': self.count,
+            'std_m': round(self.std, 4),
+            'min_m': self.min,
+            'max_m': self.max
+        }
+
+
+def default_trials_file(output_file):
+    return os.path.splitext(output_file)[0] + '_trials.csv'
+
+
+def resolve_input_files(input_spec, suffixes=RAW_SUFFIXES):
+    if os.path.isdir(input_spec):
+        files = sorted(os.path.join(input_spec, name) for name in os.listdir(input_spec)
+                       if name.endswith(suffixes))
+    elif glob.has_magic(input_spec):
+        files = sorted(glob.glob(input_spec))
+    else:
+        return [input_spec]
+    if not files:
+        raise FileNotFoundError(f"No input files ({', '.join(suffixes)}) found for {input_spec}")
+    return files
+
+
+def aggregate_shard(input_file, trials_writer=None, trials=None):
+    aggregates = {}
+    row_count = 0
+    rng = np.random.default_rng(0)
+    with open_raw_rows(input_file) as rows:
+        for row in rows:
+            size_rank = int(row['size_rank'])
+            distance = float(row['distance_m'])
+            agg = aggregates.get(size_rank)
+            if agg is None:
+                agg = aggregates[size_rank] = SizeAggregate(
+                    float(row['width_cm']), float(row['height_cm']), float(row['area_cm2'])).track_quantiles(rng)
+            agg.add(distance)
+            if trials_writer is not None:
+                trials_writer.writerow((size_rank, int(row['trial_number']), distance))
+            if trials is not None:
+                trials[size_rank].append((int(row['trial_number']), distance))
+            row_count += 1
+    for agg in aggregates.values():
+        agg.flush()
+    return row_count, aggregates
+
+
+@instrument(rows=lambda args, result: result[0])
+def aggregate_file(input_file, chunk_rows=1_000_000):
+    if input_file.endswith(BINARY_SUFFIX):
+        return aggregate_shard(input_file)
+    aggregates = {}
+    row_count = 0
+    rng = np.random.default_rng(0)
+    reader = pd.read_csv(input_file, usecols=AGGREGATE_COLUMNS, chunksize=chunk_rows,
+                         dtype={'size_rank': np.int64, 'distance_m': np.float64})
+    for chunk in reader:
+        grouped = chunk.groupby('size_rank', sort=False)
+        stats = grouped['distance_m'].agg(['count', 'mean', 'min', 'max'])
+        stats['m2'] = grouped['distance_m'].var(ddof=0) * stats['count']
+        dims = grouped[['width_cm', 'height_cm', 'area_cm2']].first()
+        distances = grouped['distance_m'].indices
+        values = chunk['distance_m'].to_numpy()
+        for size_rank, row, dim in zip(stats.index, stats.itertuples(index=False), dims.itertuples(index=False)):
+            agg = SizeAggregate(float(dim.width_cm), float(dim.height_cm), float(dim.area_cm2))
+            agg.count, agg.mean, agg.m2 = int(row.count), float(row.mean), float(row.m2)
+            agg.min, agg.max = float(row.min), float(row.max)
+            agg.sketch = QuantileSketch().add_many(values[distances[size_rank]], rng)
+            if size_rank in aggregates:
+                aggregates[size_rank].merge(agg)
+            else:
+                aggregates[int(size_rank)] = agg
+        row_count += len(chunk)
+    return row_count, aggregates
+
+
+def save_aggregates(aggregates_file, aggregates):
+    with open(aggregates_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'aggregates': {str(k): v.to_state() for k, v in aggregates.items()}}, f)
+    os.replace(aggregates_file + '.tmp', aggregates_file)
+
+
+def load_aggregates(aggregates_file):
+    with open(aggregates_file, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    return {int(k): SizeAggregate.from_state(v) for k, v in state['aggregates'].items()}
+
+
+def _process_shard(task):
+    input_file, keep_trials, trials_part = task
+    trials = defaultdict(list) if keep_trials else None
+    if trials_part is None:
+        row_count, aggregates = aggregate_shard(input_file, trials=trials)
+    else:
+        with open(trials_part, 'w', newline='', encoding='utf-8') as t:
+            row_count, aggregates = aggregate_shard(input_file, trials_writer=csv.writer(t))
+    return row_count, aggregates, trials
+
+
+def merge_aggregates(partials):
+    merged = {}
+    for aggregates in partials:
+        for size_rank, agg in aggregates.items():
+            if size_rank in merged:
+                merged[size_rank].merge(agg)
+            else:
+                merged[size_rank] = agg
+    return merged
+
+
+def write_processed(output_file, aggregates, trials=None):
+    if trials is None:
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=STREAM_FIELDS)
+            writer.writeheader()
+            for size_rank in sorted(aggregates.keys()):
+                writer.writerow(aggregates[size_rank].to_row(size_rank))
+        return
+    
+    max_trials = max((len(t) for t in trials.values()), default=0)
+    fieldnames = BASE_FIELDS + [f'trial_{i}' for i in range(1, max_trials + 1)]
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for size_rank in sorted(aggregates.keys()):
+            row = aggregates[size_rank].to_row(size_rank)
+            processed_row = {field: row[field] for field in BASE_FIELDS}
+            distances = [d for _, d in sorted(trials[size_rank], key=lambda t: t[0])]
+            for i, distance in enumerate(distances, 1):
+                processed_row[f'trial_{i}'] = distance
+            writer.writerow(processed_row)
+
+
+def process_flight_shards(input_files, output_file, streaming=False, trials_file=None, workers=None):
+    if streaming and trials_file is None:
+        trials_file = default_trials_file(output_file)
+    
+    print("=== Data Processing Script (sharded) ===")
+    print(f"Input: {len(input_files)} shard files")
+    print(f"Output: {output_file}\n")
+    
+    print("Step 1: Aggregating shards...")
+    parts = [f"{trials_file}.part{i}" for i in range(len(input_files))] if streaming else [None] * len(input_files)
+    tasks = [(input_file, not streaming, part) for input_file, part in zip(input_files, parts)]
+    if workers == 1 or len(tasks) <= 1:
+        results = list(map(_process_shard, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_shard, tasks))
+    row_count = sum(r[0] for r in results)
+    set_rows(row_count)
+    print(f"Aggregated {row_count} raw records from {len(input_files)} shards\n")
+    
+    print("Step 2: Merging partial aggregates...")
+    aggregates = merge_aggregates(r[1] for r in results)
+    trials = None
+    if not streaming:
+        trials = defaultdict(list)
+        for _, _, shard_trials in results:
+            for size_rank, values in shard_trials.items():
+                trials[size_rank].extend(values)
+    for size_rank in sorted(aggregates.keys()):
+        agg = aggregates[size_rank]
+        print(f"  Size {size_rank}: {agg.count} trials, mean = {agg.mean:.2f}m")
+    
+    print("\nStep 3: Exporting processed data...")
+    write_processed(output_file, aggregates, trials)
+    if streaming:
+        with open(trials_file, 'w', newline='', encoding='utf-8') as t:
+            csv.writer(t).writerow(TRIAL_FIELDS)
+            for part in parts:
+                with open(part, 'r', newline='', encoding='utf-8') as src:
+                    shutil.copyfileobj(src, t)
+                os.remove(part)
+        print(f"Trials exported to: {trials_file}")
+    print(f"Data exported to: {output_file}\n")
+    
+    print("=== Processing Complete ===")
+    print(f"Raw data: {row_count} rows across {len(input_files)} shards")
+    print(f"Processed data: {len(aggregates)} rows")
+    return aggregates
+
+
+def stream_flight_data(input_file, output_file, trials_file=None):
+    if trials_file is None:
+        trials_file = default_trials_file(output_file)
+    
+    print("=== Data Processing Script (streaming) ===")
+    print(f"Input: {input_file}")
+    print(f"Output: {output_file}")
+    print(f"Trials: {trials_file}\n")
+    
+    print("Step 1: Streaming raw data...")
+    with open(trials_file, 'w', newline='', encoding='utf-8') as t:
+        trials_writer = csv.writer(t)
+        trials_writer.writerow(TRIAL_FIELDS)
+        row_count, aggregates = aggregate_shard(input_file, trials_writer=trials_writer)
+    set_rows(row_count)
+    print(f"Streamed {row_count} raw records into {len(aggregates)} sizes\n")
+    
+    print("Step 2: Exporting processed data...")
+    write_processed(output_file, aggregates)
+    for size_rank in sorted(aggregates.keys()):
+        agg = aggregates[size_rank]
+        print(f"  Size {size_rank}: {agg.count} trials, mean = {agg.mean:.2f}m")
+    
+    print(f"\nData exported to: {output_file}")
+    print(f"Trials exported to: {trials_file}\n")
+    
+    print("=== Processing Complete ===")
+    print(f"Raw data: {row_count} rows (long format)")
+    print(f"Processed data: {len(aggregates)} rows (summary format)")
+    return aggregates
+
+
+def default_state_file(output_file):
+    return output_file + '.state.json'
+
+
+def _window_digest(f, offset):
+    start = max(0, offset - WATERMARK_WINDOW)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def _load_state(state_file, input_file, streaming, outputs):
+    if not os.path.exists(state_file) or not all(os.path.exists(path) for path in outputs):
+        return None
+    with open(state_file, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('input') != os.path.abspath(input_file) or state.get('streaming') != streaming:
+        return None
+    info = os.stat(input_file)
+    if 'window' not in state or state.get('inode') != info.st_ino or info.st_size < state['offset']:
+        return None
+    if not streaming and not state.get('columns'):
+        return None
+    with open(input_file, 'rb') as f:
+        if f.readline().decode('utf-8').rstrip('\r\n') != state['header']:
+            return None
+        if _window_digest(f, state['offset']) != state['window']:
+            return None
+    return state
+
+
+def _read_tail(f):
+    for line in iter(f.readline, b''):
+        if not line.endswith(b'\n'):
+            f.seek(-len(line), os.SEEK_CUR)
+            break
+        yield line.decode('utf-8')
+
+
+def _aggregate_tail(f, state):
+    if state is None:
+        f.seek(0)
+        header = f.readline().decode('utf-8').rstrip('\r\n')
+    else:
+        header = state['header']
+        f.seek(state['offset'])
+    aggregates = {}
+    new_rows = []
+    rng = np.random.default_rng(f.tell())
+    for row in csv.DictReader(_read_tail(f), fieldnames=next(csv.reader([header]))):
+        size_rank = int(row['size_rank'])
+        distance = float(row['distance_m'])
+        agg = aggregates.get(size_rank)
+        if agg is None:
+            agg = aggregates[size_rank] = SizeAggregate(
+                float(row['width_cm']), float(row['height_cm']), float(row['area_cm2'])).track_quantiles(rng)
+        agg.add(distance)
+        new_rows.append((size_rank, int(row['trial_number']), distance))
+    return header, aggregates, new_rows
+
+
+def _read_processed(output_file):
+    if not os.path.exists(output_file):
+        return {}
+    with open(output_file, 'r', newline='', encoding='utf-8') as f:
+        return {int(row['size_rank']): row for row in csv.DictReader(f)}
+
+
+def _write_rows(output_file, fieldnames, rows):
+    tmp = output_file + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, output_file)
+
+
+def _wide_rows(size_rank, agg, distances, columns):
+    base = [agg.to_row(size_rank)[field] for field in BASE_FIELDS]
+    for start in range(0, len(distances), columns):
+        yield base + distances[start:start + columns]
+
+
+@instrument()
+def incremental_flight_data(input_file, output_file, streaming=False, trials_file=None, state_file=None):
+    if not input_file.endswith('.csv'):
+        raise ValueError("Incremental mode needs an uncompressed, append-only CSV input")
+    if state_file is None:
+        state_file = default_state_file(output_file)
+    if streaming and trials_file is None:
+        trials_file = default_trials_file(output_file)
+    
+    print("=== Data Processing Script (incremental) ===")
+    print(f"Input: {input_file}")
+    print(f"Output: {output_file}")
+    print(f"State: {state_file}\n")
+    
+    state = _load_state(state_file, input_file, streaming, [output_file, trials_file] if streaming else [output_file])
+    if state is None:
+        print("Step 1: No usable watermark, processing from the start...")
+    else:
+        print(f"Step 1: Resuming after byte {state['offset']}...")
+    
+    print("Step 2: Aggregating appended rows...")
+    with open(input_file, 'rb') as f:
+        header, tail_aggregates, new_rows = _aggregate_tail(f, state)
+        if state is not None and not streaming:
+            last_trial = {int(k): v for k, v in state['last_trial'].items()}
+            if any(trial <= last_trial.get(size_rank, -math.inf) for size_rank, trial, _ in new_rows):
+                print("Appended trials are out of order, processing from the start...")
+                state = None
+                header, tail_aggregates, new_rows = _aggregate_tail(f, state)
+        new_offset = f.tell()
+        window = _window_digest(f, new_offset)
+        inode = os.fstat(f.fileno()).st_ino
+    if state is None:
+        aggregates, last_trial = tail_aggregates, {}
+    else:
+        aggregates = {int(k): SizeAggregate.from_state(v) for k, v in state['aggregates'].items()}
+        aggregates = merge_aggregates([aggregates, tail_aggregates])
+    row_count = len(new_rows)
+    set_rows(row_count)
+    print(f"Read {row_count} new records affecting {len(tail_aggregates)} sizes\n")
+    
+    print("Step 3: Updating processed data...")
+    for size_rank in sorted(tail_aggregates.keys()):
+        agg = aggregates[size_rank]
+        print(f"  Size {size_rank}: {agg.count} trials, mean = {agg.mean:.2f}m")
+    
+    if streaming:
+        processed = _read_processed(output_file) if state is not None else {}
+        processed.update((size_rank, aggregates[size_rank].to_row(size_rank)) for size_rank in tail_aggregates)
+        if tail_aggregates or state is None:
+            _write_rows(output_file, STREAM_FIELDS, [processed[k] for k in sorted(processed.keys())])
+        with open(trials_file, 'a' if state is not None else 'w', newline='', encoding='utf-8') as t:
+            trials_writer = csv.writer(t)
+            if state is None:
+                trials_writer.writerow(TRIAL_FIELDS)
+            trials_writer.writerows(new_rows)
+    else:
+        trials = defaultdict(list)
+        for size_rank, trial_number, distance in new_rows:
+            trials[size_rank].append((trial_number, distance))
+        for size_rank, values in trials.items():
+            values.sort(key=lambda t: t[0])
+            last_trial[size_rank] = values[-1][0]
+        columns = state['columns'] if state is not None else max((len(v) for v in trials.values()), default=0)
+        rows = [row for size_rank in sorted(trials.keys())
+                for row in _wide_rows(size_rank, aggregates[size_rank], [d for _, d in trials[size_rank]], columns)]
+        if state is None:
+            fieldnames = BASE_FIELDS + [f'trial_{i}' for i in range(1, columns + 1)]
+            _write_rows(output_file, fieldnames, [dict(zip(fieldnames, row)) for row in rows])
+        elif rows:
+            with open(output_file, 'a', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(rows)
+    
+    new_state = {
+        'input': os.path.abspath(input_file),
+        'streaming': streaming,
+        'header': header,
+        'offset': new_offset,
+        'inode': inode,
+        'window': window,
+        'aggregates': {str(k): v.to_state() for k, v in aggregates.items()}
+    }
+    if not streaming:
+        new_state['columns'] = columns
+        new_state['last_trial'] = {str(k): v for k, v in last_trial.items()}
+    with open(state_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(new_state, f)
+    os.replace(state_file + '.tmp', state_file)
+    
+    print(f"\nData exported to: {output_file}")
+    print(f"Watermark: byte {new_offset}\n")
+    
+    print("=== Processing Complete ===")
+    print(f"New raw data: {row_count} rows")
+    print(f"Updated sizes: {len(tail_aggregates)} of {len(aggregates)}")
+    return aggregates
+
+
+@instrument()
+def process_flight_data(input_file, output_file, streaming=False, trials_file=None, workers=None):
+    input_files = resolve_input_files(input_file)
+    if len(input_files) != 1 or input_files[0] != input_file:
+        return process_flight_shards(input_files, output_file, streaming, trials_file, workers)
+    if streaming:
+        return stream_flight_data(input_file, output_file, trials_file)
+    
     print("=== Data Processing Script ===")
     print(f"Input: {input_file}")
     print(f"Output: {output_file}\n")
     
     print("Step 1: Reading raw data...")
     raw_data = []
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    with open_raw_rows(input_file) as reader:
         for row in reader:
             raw_data.append(row)
+    set_rows(len(raw_data))
     print(f"Read {len(raw_data)} raw records\n")
     
     print("Step 2: Grouping by size...")
@@ -31,6 +554,7 @@ def process_flight_data(input_file, output_file):
     
     print("Step 3: Calculating statistics...")
     processed_data = []
+    max_trials = 0
     for size_rank in sorted(grouped_data.keys()):
         trials = grouped_data[size_rank]
         
@@ -47,8 +571,9 @@ def process_flight_data(input_file, output_file):
             'mean_m': round(mean_distance, 2)
         }
         
-        for i, distance in enumerate(distances[:10], 1):
+        for i, distance in enumerate(distances, 1):
             processed_row[f'trial_{i}'] = distance
+        max_trials = max(max_trials, len(distances))
         
         processed_data.append(processed_row)
         print(f"  Size {size_rank}: {len(distances)} trials, mean = {mean_distance:.2f}m")
@@ -56,9 +581,7 @@ def process_flight_data(input_file, output_file):
     print(f"\nProcessed {len(processed_data)} sizes\n")
     
     print("Step 4: Exporting processed data...")
-    fieldnames = ['size_rank', 'width_cm', 'height_cm', 'area_cm2', 'mean_m',
-                  'trial_1', 'trial_2', 'trial_3', 'trial_4', 'trial_5',
-                  'trial_6', 'trial_7', 'trial_8', 'trial_9', 'trial_10']
+    fieldnames = BASE_FIELDS + [f'trial_{i}' for i in range(1, max_trials + 1)]
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -73,14 +596,35 @@ def process_flight_data(input_file, output_file):
     print(f"\nTransformations:")
     print(f"  - Long format to wide format")
     print(f"  - Calculated mean distances")
-    print(f"  - Arranged 10 trials horizontally per size")
+    print(f"  - Arranged {max_trials} trials horizontally per size")
 
 
 def main():
-    input_file = "../Data/raw_flight_data.csv"
-    output_file = "../Data/processed_flights_data.csv"
+    parser = argparse.ArgumentParser(description="Convert raw paper-plane flight data to per-size summaries")
+    parser.add_argument("--input", default="../Data/raw_flight_data.csv", help="Raw data file (.csv, .csv.gz or .ppf), a directory of shards, or a glob pattern")
+    parser.add_argument("--output", default="../Data/processed_flights_data.csv", help="Processed per-size CSV")
+    parser.add_argument("--stream", action="store_true", help="Single-pass mode with constant memory per size")
+    parser.add_argument("--trials-output", default=None, help="Long-format trials sidecar for --stream (default: <output>_trials.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for directory/glob input (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process rows appended since the last run's watermark; in wide mode each run "
+                             "appends one row per updated size holding its new trials")
+    parser.add_argument("--state", default=None, help="Watermark state file for --incremental (default: <output>.state.json)")
+    parser.add_argument("--aggregates-output", default=None,
+                        help="Also save exact mergeable per-size aggregates (JSON) for out-of-core analysis")
+    args = parser.parse_args()
     
-    process_flight_data(input_file, output_file)
+    if args.incremental:
+        aggregates = incremental_flight_data(args.input, args.output, streaming=args.stream,
+                                             trials_file=args.trials_output, state_file=args.state)
+    else:
+        aggregates = process_flight_data(args.input, args.output, streaming=args.stream,
+                                         trials_file=args.trials_output, workers=args.workers)
+    if args.aggregates_output:
+        if aggregates is None:
+            _, aggregates = aggregate_file(args.input)
+        save_aggregates(args.aggregates_output, aggregates)
+        print(f"Aggregates saved to: {args.aggregates_output}")
 
 
 if __name__ == "__main__":
@@ -1,120 +1,533 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
 import csv
-from datetime import datetime
-from typing import List, Dict
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import List, Dict, Iterable, Optional
+
+import numpy as np
+
+from data_cleaning import SizeAggregate
+from flight_format import BINARY_SUFFIX, FIELDNAMES, open_text, write_flight_binary
+from instrumentation import count_calls, instrument_methods, set_rows, span
+
+PILOT_FLIGHT_DATA = {
+    1: [13.84, 11.20, 15.16, 12.52, 17.79, 8.57, 11.20, 13.18, 15.16, 13.18],
+    2: [12.51, 10.63, 14.39, 13.14, 16.89, 8.13, 11.88, 12.51, 14.39, 10.63],
+    3: [7.44, 6.32, 8.56, 7.07, 10.04, 4.84, 8.56, 7.81, 6.32, 7.44],
+    4: [7.48, 6.36, 8.60, 7.85, 10.10, 4.86, 7.11, 7.48, 8.60, 6.36],
+    5: [6.73, 5.72, 7.74, 7.07, 9.09, 4.37, 6.39, 6.73, 7.74, 5.72],
+    6: [4.56, 3.88, 5.24, 4.33, 6.16, 2.96, 4.79, 4.56, 5.24, 3.88],
+    7: [4.76, 4.05, 5.47, 4.52, 6.43, 3.09, 5.00, 4.76, 5.47, 4.05],
+    8: [4.42, 3.76, 5.08, 4.20, 5.97, 2.87, 4.64, 4.42, 5.08, 3.76],
+    9: [2.29, 1.95, 2.63, 2.18, 3.09, 1.49, 2.40, 2.29, 2.63, 1.95],
+    10: [2.53, 2.15, 2.91, 2.40, 3.42, 1.64, 2.66, 2.53, 2.91, 2.15],
+    11: [2.27, 1.93, 2.61, 2.16, 3.06, 1.48, 2.38, 2.27, 2.61, 1.93],
+    12: [1.67, 1.42, 1.92, 1.59, 2.25, 1.09, 1.75, 1.67, 1.92, 1.42],
+    13: [1.12, 0.95, 1.29, 1.06, 1.51, 0.73, 1.18, 1.12, 1.29, 0.95],
+    14: [1.74, 1.48, 2.00, 1.65, 2.35, 1.13, 1.83, 1.74, 2.00, 1.48],
+    15: [0.71, 0.60, 0.82, 0.67, 0.96, 0.46, 0.75, 0.71, 0.82, 0.60],
+}
+
+NOISE_MODELS = ('pilot', 'constant', 'lognormal')
+
+
+def size_step_cm(n_sizes: int) -> float:
+    pilot_sizes = len(PILOT_FLIGHT_DATA)
+    return 1.0 if n_sizes <= pilot_sizes else (pilot_sizes - 1) / (n_sizes - 1)
+
+
+class FlightRecord:
+    __slots__ = tuple(FIELDNAMES)
+
+    def __init__(self, size_rank: int, width_cm: float, height_cm: float, area_cm2: float,
+                 trial_number: int, distance_m: float, timestamp: str, notes: str = ""):
+        self.size_rank = size_rank
+        self.width_cm = width_cm
+        self.height_cm = height_cm
+        self.area_cm2 = area_cm2
+        self.trial_number = trial_number
+        self.distance_m = distance_m
+        self.timestamp = timestamp
+        self.notes = notes
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+
+class FlightColumns:
+    __slots__ = ('size_rank', 'trial_number', 'distance_m', 'timestamp_id', 'timestamps', 'notes', 'dimensions')
+
+    def __init__(self, dimensions=None):
+        self.dimensions = dimensions
+        self.size_rank = array('h')
+        self.trial_number = array('i')
+        self.distance_m = array('d')
+        self.timestamp_id = array('I')
+        self.timestamps = []
+        self.notes = {}
+
+    def __len__(self):
+        return len(self.distance_m)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> FlightRecord:
+        if i < 0:
+            i += len(self)
+        size_rank = self.size_rank[i]
+        width, height, area = self.dimensions(size_rank) if self.dimensions else (None, None, None)
+        return FlightRecord(size_rank, width, height, area, self.trial_number[i], self.distance_m[i],
+                            self.timestamps[self.timestamp_id[i]], self.notes.get(i, ""))
+
+    def _timestamp_id(self, timestamp: str) -> int:
+        if not self.timestamps or self.timestamps[-1] != timestamp:
+            self.timestamps.append(timestamp)
+        return len(self.timestamps) - 1
+
+    def append(self, size_rank: int, trial_number: int, distance_m: float, timestamp: str, notes: str = ""):
+        if notes:
+            self.notes[len(self)] = notes
+        self.size_rank.append(size_rank)
+        self.trial_number.append(trial_number)
+        self.distance_m.append(distance_m)
+        self.timestamp_id.append(self._timestamp_id(timestamp))
+
+    def extend(self, size_ranks: Iterable[int], trial_numbers: Iterable[int], distances_m: Iterable[float],
+               timestamp: str, notes: Optional[Iterable[str]] = None):
+        start = len(self)
+        self.size_rank.extend(int(s) for s in size_ranks)
+        self.trial_number.extend(int(t) for t in trial_numbers)
+        self.distance_m.extend(round(float(d), 2) for d in distances_m)
+        count = len(self.distance_m) - start
+        if len(self.size_rank) != len(self.distance_m) or len(self.trial_number) != len(self.distance_m):
+            del self.size_rank[start:], self.trial_number[start:], self.distance_m[start:]
+            raise ValueError("size_ranks, trial_numbers and distances_m must have the same length")
+        self.timestamp_id.extend([self._timestamp_id(timestamp)] * count)
+        if notes is not None:
+            for i, note in enumerate(notes, start):
+                if note:
+                    self.notes[i] = note
+
+    def rows(self, dimensions) -> Iterable[list]:
+        timestamps = self.timestamps
+        notes = self.notes
+        for i, (size_rank, trial_number, distance, ts_id) in enumerate(
+                zip(self.size_rank, self.trial_number, self.distance_m, self.timestamp_id)):
+            width, height, area = dimensions(size_rank)
+            yield [size_rank, width, height, area, trial_number, distance, timestamps[ts_id], notes.get(i, "")]
+
+
+class StreamingRecorder:
+    def __init__(self, collector, filename: str, flush_rows: int = 1000, flush_seconds: float = 5.0,
+                 progress_seconds: float = 10.0, batch_timestamps: bool = True,
+                 keep_in_memory: bool = True, append: bool = False, autoflush: bool = True):
+        self.collector = collector
+        self.filename = filename
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.progress_seconds = progress_seconds
+        self.batch_timestamps = batch_timestamps
+        self.keep_in_memory = keep_in_memory
+        self.rows_recorded = 0
+        self.rows_written = 0
+        
+        resume = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self._file = open_text(filename, 'a' if resume else 'w')
+        self._writer = csv.writer(self._file)
+        if not resume:
+            self._writer.writerow(FIELDNAMES)
+        self._buffer = []
+        self._timestamp = None
+        self._started = time.monotonic()
+        self._last_flush = self._started
+        self._last_progress = self._started
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+        self._trace = contextlib.ExitStack()
+        if autoflush:
+            threading.Thread(target=self._autoflush, name='StreamingRecorder-flush', daemon=True).start()
+    
+    def __enter__(self):
+        self._session = self._trace.enter_context(span('StreamingRecorder.session'))
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        finally:
+            self._session['rows'] = self.rows_recorded
+            self._trace.close()
+    
+    def _now(self) -> str:
+        if self.batch_timestamps and self._timestamp is not None:
+            return self._timestamp
+        self._timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return self._timestamp
+    
+    def _autoflush(self):
+        while not self._closed.wait(self.flush_seconds):
+            self.tick()
+    
+    def tick(self):
+        with self._lock:
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_seconds:
+                self.flush()
+    
+    def record(self, size_rank: int, trial_number: int, distance_meters: float, notes: str = ""):
+        distance = round(distance_meters, 2)
+        with self._lock:
+            self._maybe_flush()
+            timestamp = self._now()
+            width, height, area = self.collector.rounded_dimensions(size_rank)
+            self._buffer.append([size_rank, width, height, area, trial_number, distance, timestamp, notes])
+            if self.keep_in_memory:
+                self.collector.data.append(size_rank, trial_number, distance, timestamp, notes)
+            self.collector.update_size_stats(size_rank, distance)
+            self.rows_recorded += 1
+            if len(self._buffer) >= self.flush_rows:
+                self.flush()
+    
+    def record_many(self, size_ranks: Iterable[int], trial_numbers: Iterable[int],
+                    distances_meters: Iterable[float], notes: Optional[Iterable[str]] = None):
+        size_ranks, trial_numbers, distances_meters = list(size_ranks), list(trial_numbers), list(distances_meters)
+        notes = [""] * len(distances_meters) if notes is None else list(notes)
+        if not len(size_ranks) == len(trial_numbers) == len(distances_meters) == len(notes):
+            raise ValueError("size_ranks, trial_numbers, distances_meters and notes must have the same length")
+        dimensions = self.collector.rounded_dimensions
+        distances = [round(float(d), 2) for d in distances_meters]
+        with self._lock:
+            self._maybe_flush()
+            timestamp = self._now()
+            self._buffer.extend([int(s), *dimensions(int(s)), int(t), d, timestamp, n]
+                                for s, t, d, n in zip(size_ranks, trial_numbers, distances, notes))
+            if self.keep_in_memory:
+                self.collector.data.extend(size_ranks, trial_numbers, distances, timestamp, notes)
+            self.collector.update_size_stats_bulk(size_ranks, distances)
+            self.rows_recorded += len(distances)
+            set_rows(len(distances))
+            if len(self._buffer) >= self.flush_rows:
+                self.flush()
+    
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if len(self._buffer) >= self.flush_rows or now - self._last_flush >= self.flush_seconds:
+            self.flush()
+        if now - self._last_progress >= self.progress_seconds:
+            self._last_progress = now
+            rate = self.rows_recorded / max(now - self._started, 1e-9)
+            print(f"Recorded {self.rows_recorded} measurements ({rate:.0f}/s), {self.rows_written} written to {self.filename}")
+    
+    def flush(self):
+        with self._lock:
+            set_rows(len(self._buffer))
+            if self._buffer:
+                self._writer.writerows(self._buffer)
+                self.rows_written += len(self._buffer)
+                self._buffer.clear()
+            self._file.flush()
+            self._timestamp = None
+            self._last_flush = time.monotonic()
+    
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            if self._file.closed:
+                return
+            self.flush()
+            self._file.close()
+        print(f"\nData streamed to: {self.filename}")
+        print(f"Total records: {self.rows_written}")
+
 
 class PaperPlaneDataCollector:
-    def __init__(self):
-        self.data = []
+    def __init__(self, n_sizes: int = len(PILOT_FLIGHT_DATA)):
+        self.data = FlightColumns(self.rounded_dimensions)
         self.us_letter_width = 27.94
         self.us_letter_height = 21.59
+        self.size_step_cm = size_step_cm(n_sizes)
+        self._rounded_dimensions = {}
+        self.size_stats = {}
+        
+    def set_size_count(self, n_sizes: int):
+        step_cm = size_step_cm(n_sizes)
+        if step_cm != self.size_step_cm:
+            self.size_step_cm = step_cm
+            self._rounded_dimensions.clear()
         
-    def calculate_dimensions(self, size_rank: int) -> tuple:
-        reduction = size_rank - 1
+    def calculate_dimensions(self, size_rank: int, step_cm: Optional[float] = None) -> tuple:
+        reduction = (size_rank - 1) * (self.size_step_cm if step_cm is None else step_cm)
         width = self.us_letter_width - reduction
         height = self.us_letter_height - reduction
         area = width * height
         return width, height, area
     
+    def rounded_dimensions(self, size_rank: int) -> tuple:
+        dims = self._rounded_dimensions.get(size_rank)
+        if dims is None:
+            width, height, area = self.calculate_dimensions(size_rank)
+            dims = (round(width, 2), round(height, 2), round(area, 2))
+            self._rounded_dimensions[size_rank] = dims
+        return dims
+    
+    def update_size_stats(self, size_rank: int, distance: float):
+        stats = self.size_stats.get(size_rank)
+        if stats is None:
+            stats = self.size_stats[size_rank] = SizeAggregate(*self.rounded_dimensions(size_rank))
+        stats.add(distance)
+    
+    def update_size_stats_bulk(self, size_ranks: Iterable[int], distances: Iterable[float]):
+        sizes, groups = np.unique(np.asarray(size_ranks), return_inverse=True)
+        distances = np.asarray(distances, dtype=float)
+        counts = np.bincount(groups)
+        means = np.bincount(groups, distances) / counts
+        m2 = np.bincount(groups, (distances - means[groups]) ** 2)
+        mins = np.full(len(sizes), np.inf)
+        maxs = np.full(len(sizes), -np.inf)
+        np.minimum.at(mins, groups, distances)
+        np.maximum.at(maxs, groups, distances)
+        for i, size_rank in enumerate(sizes.tolist()):
+            batch = SizeAggregate(*self.rounded_dimensions(size_rank))
+            batch.count, batch.mean, batch.m2 = int(counts[i]), float(means[i]), float(m2[i])
+            batch.min, batch.max = float(mins[i]), float(maxs[i])
+            if size_rank in self.size_stats:
+                self.size_stats[size_rank].merge(batch)
+            else:
+                self.size_stats[size_rank] = batch
+    
+    def size_summary(self, size_rank: int) -> SizeAggregate:
+        return self.size_stats[size_rank]
+    
+    def mean_distance(self, size_rank: int) -> float:
+        return self.size_stats[size_rank].mean
+    
+    def std_distance(self, size_rank: int) -> float:
+        return self.size_stats[size_rank].std
+    
     def add_measurement(self, size_rank: int, trial_number: int, distance_meters: float, notes: str = ""):
-        width, height, area = self.calculate_dimensions(size_rank)
-        
-        measurement = {
-            'size_rank': size_rank,
-            'width_cm': round(width, 2),
-            'height_cm': round(height, 2),
-            'area_cm2': round(area, 2),
-            'trial_number': trial_number,
-            'distance_m': round(distance_meters, 2),
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'notes': notes
-        }
-        
-        self.data.append(measurement)
+        distance = round(distance_meters, 2)
+        self.data.append(size_rank, trial_number, distance,
+                         datetime.now().strftime('%Y-%m-%d %H:%M:%S'), notes)
+        self.update_size_stats(size_rank, distance)
         print(f"Recorded: Size {size_rank} Trial {trial_number} -> {distance_meters}m")
     
+    def add_measurements(self, size_ranks: Iterable[int], trial_numbers: Iterable[int],
+                         distances_meters: Iterable[float], notes: Optional[Iterable[str]] = None):
+        start = len(self.data)
+        self.data.extend(size_ranks, trial_numbers, distances_meters,
+                         datetime.now().strftime('%Y-%m-%d %H:%M:%S'), notes)
+        self.update_size_stats_bulk(self.data.size_rank[start:], self.data.distance_m[start:])
+        set_rows(len(self.data) - start)
+        print(f"Recorded: {len(self.data) - start} measurements")
+    
+    def stream_to_csv(self, filename: str = "flight_data.csv", **options) -> StreamingRecorder:
+        return StreamingRecorder(self, filename, **options)
+    
+    def export(self, filename: str = "flight_data.csv"):
+        set_rows(len(self.data))
+        if filename.endswith(BINARY_SUFFIX):
+            self.export_to_binary(filename)
+        else:
+            self.export_to_csv(filename)
+    
     def export_to_csv(self, filename: str = "flight_data.csv"):
         if not self.data:
             print("Warning: No data to export")
             return
         
-        fieldnames = ['size_rank', 'width_cm', 'height_cm', 'area_cm2', 
-                     'trial_number', 'distance_m', 'timestamp', 'notes']
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.data)
+        with open_text(filename, 'w') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
+            writer.writerows(self.data.rows(self.rounded_dimensions))
+        set_rows(len(self.data))
         
         print(f"\nData exported to: {filename}")
         print(f"Total records: {len(self.data)}")
     
-    def display_summary(self):
+    def export_to_binary(self, filename: str = "flight_data" + BINARY_SUFFIX):
         if not self.data:
+            print("Warning: No data to export")
+            return
+        
+        data = self.data
+        dimensions = {size: self.rounded_dimensions(size) for size in set(data.size_rank)}
+        write_flight_binary(filename, data.size_rank, data.trial_number, data.distance_m,
+                            data.timestamp_id, data.timestamps, data.notes, dimensions)
+        set_rows(len(data))
+        
+        print(f"\nData exported to: {filename}")
+        print(f"Total records: {len(data)}")
+    
+    def simulate_experiment(self, n_sizes: int = 15, trials_per_size: int = 10, sessions: int = 1,
+                            noise: str = 'pilot', cv: float = 0.19, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        if noise not in NOISE_MODELS:
+            raise ValueError(f"noise must be one of {NOISE_MODELS}")
+        rng = np.random.default_rng(seed)
+        
+        pilot_sizes = np.array(sorted(PILOT_FLIGHT_DATA))
+        pilot = [np.array(PILOT_FLIGHT_DATA[size]) for size in pilot_sizes]
+        pilot_area = self.calculate_dimensions(pilot_sizes, step_cm=1.0)[2][::-1]
+        pilot_log_mean = np.log([trials.mean() for trials in pilot])[::-1]
+        pilot_cv = np.array([trials.std(ddof=1) / trials.mean() for trials in pilot])[::-1]
+        
+        self.set_size_count(n_sizes)
+        sizes = np.arange(1, n_sizes + 1)
+        width, height, area = self.calculate_dimensions(sizes)
+        means = np.exp(np.interp(area, pilot_area, pilot_log_mean))
+        cvs = np.interp(area, pilot_area, pilot_cv) if noise == 'pilot' else np.full(n_sizes, cv)
+        
+        per_session = n_sizes * trials_per_size
+        size_idx = np.tile(np.repeat(np.arange(n_sizes), trials_per_size), sessions)
+        session = np.repeat(np.arange(sessions), per_session)
+        trial_number = session * trials_per_size + np.tile(np.arange(1, trials_per_size + 1), n_sizes * sessions)
+        
+        z = rng.standard_normal(per_session * sessions)
+        if noise == 'lognormal':
+            sigma = np.sqrt(np.log1p(cvs ** 2))
+            distance = means[size_idx] * np.exp(sigma[size_idx] * z - sigma[size_idx] ** 2 / 2)
+        else:
+            distance = means[size_idx] * (1.0 + cvs[size_idx] * z)
+        
+        return {
+            'size_rank': sizes[size_idx],
+            'width_cm': np.round(width, 2)[size_idx],
+            'height_cm': np.round(height, 2)[size_idx],
+            'area_cm2': np.round(area, 2)[size_idx],
+            'trial_number': trial_number,
+            'distance_m': np.round(np.maximum(distance, 0.01), 2),
+            'session': session
+        }
+    
+    def export_experiment_csv(self, columns: Dict[str, np.ndarray], filename: str = "flight_data.csv",
+                              start: Optional[datetime] = None, chunk_rows: int = 1_000_000):
+        if start is None:
+            start = datetime.now().replace(microsecond=0)
+        sessions = int(columns['session'].max()) + 1
+        suffixes = [f",{(start + timedelta(days=k)).strftime('%Y-%m-%d %H:%M:%S')},Session {k + 1}\n"
+                    for k in range(sessions)]
+        
+        sizes, size_idx = np.unique(columns['size_rank'], return_inverse=True)
+        first = np.unique(size_idx, return_index=True)[1]
+        prefixes = [f"{size},{w!r},{h!r},{a!r},"
+                    for size, w, h, a in zip(sizes.tolist(), columns['width_cm'][first].tolist(),
+                                             columns['height_cm'][first].tolist(), columns['area_cm2'][first].tolist())]
+        
+        cents = np.rint(columns['distance_m'] * 100).astype(np.int64)
+        distances = [f",{c / 100!r}" for c in range(int(cents.max()) + 1)]
+        trials = [str(t) for t in range(int(columns['trial_number'].max()) + 1)]
+        
+        total = len(cents)
+        with open_text(filename, 'w') as f:
+            f.write(",".join(FIELDNAMES) + "\n")
+            for lo in range(0, total, chunk_rows):
+                hi = min(lo + chunk_rows, total)
+                f.write("".join([
+                    prefixes[s] + trials[t] + distances[c] + suffixes[k]
+                    for s, t, c, k in zip(size_idx[lo:hi].tolist(), columns['trial_number'][lo:hi].tolist(),
+                                          cents[lo:hi].tolist(), columns['session'][lo:hi].tolist())
+                ]))
+        
+        set_rows(total)
+        print(f"\nSynthetic data exported to: {filename}")
+        print(f"Total records: {total}")
+    
+    def display_summary(self, show_trials: bool = False):
+        if not self.size_stats:
             print("No data")
             return
         
         summary = {}
-        for record in self.data:
-            size = record['size_rank']
-            if size not in summary:
-                summary[size] = []
-            summary[size].append(record['distance_m'])
+        if show_trials and len(self.data) == sum(stats.count for stats in self.size_stats.values()):
+            for size, distance in zip(self.data.size_rank, self.data.distance_m):
+                if size not in summary:
+                    summary[size] = []
+                summary[size].append(distance)
         
         print("\n=== Data Summary ===")
         print(f"{'Size':<6} {'Width(cm)':<10} {'Height(cm)':<10} {'Trials':<8} {'Mean(m)':<10} {'All Measurements(m)'}")
         print("-" * 90)
         
-        for size in sorted(summary.keys()):
+        for size in sorted(self.size_stats.keys()):
             width, height, area = self.calculate_dimensions(size)
-            trials = summary[size]
-            mean_dist = sum(trials) / len(trials)
-            trials_str = ", ".join([f"{d:.2f}" for d in trials])
-            print(f"{size:<6} {width:<10.2f} {height:<10.2f} {len(trials):<8} {mean_dist:<10.2f} {trials_str}")
+            stats = self.size_stats[size]
+            if size in summary:
+                trials_str = ", ".join([f"{d:.2f}" for d in summary[size]])
+            else:
+                trials_str = f"std {stats.std:.2f}, range [{stats.min:.2f}, {stats.max:.2f}]"
+            print(f"{size:<6} {width:<10.2f} {height:<10.2f} {stats.count:<8} {stats.mean:<10.2f} {trials_str}")
+
+
+instrument_methods(StreamingRecorder, ['record_many', 'flush'])
+count_calls(StreamingRecorder, ['record'])
+instrument_methods(StreamingRecorder, ['close'], rows=lambda args, result: args[0].rows_written)
+count_calls(PaperPlaneDataCollector, ['add_measurement'])
+instrument_methods(PaperPlaneDataCollector, ['add_measurements', 'export', 'export_to_csv',
+                                             'export_to_binary', 'export_experiment_csv'])
+instrument_methods(PaperPlaneDataCollector, ['simulate_experiment'], rows=lambda args, result: len(result['distance_m']))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Paper plane flight distance data collection")
+    parser.add_argument("--synthetic", action="store_true", help="Generate a synthetic experiment instead of recording the pilot data")
+    parser.add_argument("--sizes", type=int, default=15, help="Number of size groups for --synthetic")
+    parser.add_argument("--trials", type=int, default=10, help="Trials per size per session for --synthetic")
+    parser.add_argument("--sessions", type=int, default=1, help="Number of sessions for --synthetic")
+    parser.add_argument("--noise", choices=NOISE_MODELS, default='pilot', help="Noise model: pilot per-size CV, constant CV, or lognormal")
+    parser.add_argument("--cv", type=float, default=0.19, help="Coefficient of variation for the constant/lognormal noise models")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for --synthetic")
+    parser.add_argument("--output", default="../Data/raw_flight_data.csv", help=f"Output file (.csv, .csv.gz or {BINARY_SUFFIX})")
+    args = parser.parse_args()
+    
     collector = PaperPlaneDataCollector()
     
+    if args.synthetic:
+        print("=== Synthetic Paper Plane Experiment ===")
+        print(f"- Sizes: {args.sizes}, trials per size: {args.trials}, sessions: {args.sessions}")
+        print(f"- Noise model: {args.noise}, seed: {args.seed}")
+        columns = collector.simulate_experiment(args.sizes, args.trials, args.sessions,
+                                                args.noise, args.cv, args.seed)
+        collector.export_experiment_csv(columns, args.output)
+        return
+    
     print("=== Paper Plane Flight Distance Data Collection System ===\n")
     print("Experiment Setup:")
     print(f"- Starting size: US Letter ({collector.us_letter_width} x {collector.us_letter_height} cm)")
     print("- Each size: Width and height reduced by 1cm")
     print("- Each size: 10 flight trials\n")
     
-    flight_data = {
-        1: [13.84, 11.20, 15.16, 12.52, 17.79, 8.57, 11.20, 13.18, 15.16, 13.18],
-        2: [12.51, 10.63, 14.39, 13.14, 16.89, 8.13, 11.88, 12.51, 14.39, 10.63],
-        3: [7.44, 6.32, 8.56, 7.07, 10.04, 4.84, 8.56, 7.81, 6.32, 7.44],
-        4: [7.48, 6.36, 8.60, 7.85, 10.10, 4.86, 7.11, 7.48, 8.60, 6.36],
-        5: [6.73, 5.72, 7.74, 7.07, 9.09, 4.37, 6.39, 6.73, 7.74, 5.72],
-        6: [4.56, 3.88, 5.24, 4.33, 6.16, 2.96, 4.79, 4.56, 5.24, 3.88],
-        7: [4.76, 4.05, 5.47, 4.52, 6.43, 3.09, 5.00, 4.76, 5.47, 4.05],
-        8: [4.42, 3.76, 5.08, 4.20, 5.97, 2.87, 4.64, 4.42, 5.08, 3.76],
-        9: [2.29, 1.95, 2.63, 2.18, 3.09, 1.49, 2.40, 2.29, 2.63, 1.95],
-        10: [2.53, 2.15, 2.91, 2.40, 3.42, 1.64, 2.66, 2.53, 2.91, 2.15],
-        11: [2.27, 1.93, 2.61, 2.16, 3.06, 1.48, 2.38, 2.27, 2.61, 1.93],
-        12: [1.67, 1.42, 1.92, 1.59, 2.25, 1.09, 1.75, 1.67, 1.92, 1.42],
-        13: [1.12, 0.95, 1.29, 1.06, 1.51, 0.73, 1.18, 1.12, 1.29, 0.95],
-        14: [1.74, 1.48, 2.00, 1.65, 2.35, 1.13, 1.83, 1.74, 2.00, 1.48],
-        15: [0.71, 0.60, 0.82, 0.67, 0.96, 0.46, 0.75, 0.71, 0.82, 0.60],
-    }
+    flight_data = PILOT_FLIGHT_DATA
     
     print("Recording data...\n")
     
-    for size_rank in sorted(flight_data.keys()):
-        print(f"\n--- Size {size_rank} ---")
-        for trial_num, distance in enumerate(flight_data[size_rank], 1):
-            collector.add_measurement(
-                size_rank=size_rank,
-                trial_number=trial_num,
-                distance_meters=distance,
-                notes=f"Size {size_rank} Trial {trial_num}"
-            )
+    with span('record_pilot_data') as record:
+        for size_rank in sorted(flight_data.keys()):
+            print(f"\n--- Size {size_rank} ---")
+            for trial_num, distance in enumerate(flight_data[size_rank], 1):
+                collector.add_measurement(
+                    size_rank=size_rank,
+                    trial_number=trial_num,
+                    distance_meters=distance,
+                    notes=f"Size {size_rank} Trial {trial_num}"
+                )
+        record['rows'] = len(collector.data)
     
-    collector.display_summary()
+    collector.display_summary(show_trials=True)
     
-    collector.export_to_csv("../Data/raw_flight_data.csv")
+    collector.export(args.output)
     
     print("\n=== Complete ===")
     print("Generated file:")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = '.flight_cache'
+CACHE_VERSION = 2
+
+COLUMN_DTYPES = {
+    'size_rank': np.int16,
+    'width_cm': np.float32,
+    'height_cm': np.float32,
+    'area_cm2': np.float64,
+    'trial_number': np.int32,
+    'distance_m': np.float64,
+    'timestamp': str,
+    'notes': str
+}
+
+ANALYSIS_COLUMNS = ['size_rank', 'distance_m']
+PLOT_COLUMNS = ['size_rank', 'width_cm', 'height_cm', 'area_cm2', 'distance_m']
+
+
+def cache_key(data_file):
+    st = os.stat(data_file)
+    ident = f"{os.path.abspath(data_file)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]
+
+
+def _cache_prefix(data_file):
+    source = hashlib.sha1(os.path.abspath(data_file).encode('utf-8')).hexdigest()[:8]
+    return f"{os.path.basename(data_file)}-{source}-v{CACHE_VERSION}-"
+
+
+def cache_path(data_file, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(data_file)), CACHE_DIR_NAME)
+    return os.path.join(cache_dir, _cache_prefix(data_file) + cache_key(data_file))
+
+
+def narrow_int(values, dtype):
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return values
+    return values.astype(dtype)
+
+
+def read_flight_csv(data_file, columns=None):
+    dtypes = {col: np.int64 if np.issubdtype(dtype, np.integer) else dtype
+              for col, dtype in COLUMN_DTYPES.items() if columns is None or col in columns}
+    df = pd.read_csv(data_file, usecols=columns, dtype=dtypes)
+    for col, dtype in COLUMN_DTYPES.items():
+        if col in df.columns and col in dtypes and np.issubdtype(dtype, np.integer):
+            df[col] = narrow_int(df[col].to_numpy(), dtype)
+    return df
+
+
+def widen_float32(values):
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        return values.astype(np.float64)
+    wide = values.astype(np.float64)
+    with np.errstate(divide='ignore'):
+        exponent = np.floor(np.log10(np.abs(wide)))
+    scale = 10.0 ** (6 - np.where(np.isfinite(exponent), exponent, 0))
+    return np.round(wide * scale) / scale
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if 'order' in meta else None
+
+
+def _save_columns(df, directory, meta):
+    for col in df.columns:
+        values = df[col]
+        stem = f"{len(meta['order'])}-{uuid.uuid4().hex[:8]}"
+        entry = {'file': f"{stem}.npy", 'text': None, 'nullable': False}
+        if not pd.api.types.is_numeric_dtype(values):
+            entry['text'] = str(values.dtype)
+            if values.isna().any():
+                entry['nullable'] = True
+                np.save(os.path.join(directory, f"{stem}.isna.npy"), values.isna().to_numpy())
+            values = values.fillna('')
+            values = values.to_numpy(dtype=str)
+        else:
+            values = values.to_numpy()
+        np.save(os.path.join(directory, entry['file']), values)
+        meta['order'].append(col)
+        meta['columns'][col] = entry
+
+
+def _write_meta(directory, meta):
+    tmp = os.path.join(directory, f"meta.json.{uuid.uuid4().hex}")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(directory, 'meta.json'))
+
+
+def _write_cache(df, path, meta):
+    if meta is not None:
+        meta = {'order': list(meta['order']), 'columns': dict(meta['columns'])}
+        _save_columns(df, path, meta)
+        _write_meta(path, meta)
+        return
+
+    cache_dir, name = os.path.split(path)
+    tmp = os.path.join(cache_dir, f".{name}.{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    try:
+        meta = {'order': [], 'columns': {}}
+        _save_columns(df, tmp, meta)
+        _write_meta(tmp, meta)
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if _read_meta(path) is None:
+            raise
+        return
+
+    prefix = name[:-len(name.rsplit('-', 1)[1])]
+    for stale in os.listdir(cache_dir):
+        if stale.startswith(prefix) and stale != name:
+            shutil.rmtree(os.path.join(cache_dir, stale), ignore_errors=True)
+
+
+def _read_cache(path, meta, columns):
+    loaded = {}
+    for col in columns:
+        entry = meta['columns'][col]
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if entry['text'] is not None:
+            values = values.astype(object)
+            if entry['nullable']:
+                values[np.load(os.path.join(path, entry['file'][:-4] + '.isna.npy'))] = np.nan
+            values = pd.Series(values, dtype=entry['text'])
+        loaded[col] = values
+    return loaded
+
+
+def load_flight_data(data_file, columns=None, parse_timestamps=False, use_cache=True, cache_dir=None):
+    if not use_cache:
+        df = read_flight_csv(data_file, columns)
+    else:
+        path = cache_path(data_file, cache_dir)
+        meta = _read_meta(path)
+        wanted = list(pd.read_csv(data_file, nrows=0).columns) if columns is None else list(columns)
+        missing = [col for col in wanted if meta is None or col not in meta['columns']]
+        loaded = {}
+        if missing:
+            fresh = read_flight_csv(data_file, missing)
+            loaded.update(fresh.items())
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _write_cache(fresh, path, meta)
+            except OSError:
+                pass
+        if meta is not None:
+            cached = [col for col in wanted if col not in missing]
+            try:
+                loaded.update(_read_cache(path, meta, cached))
+            except OSError:
+                loaded.update(read_flight_csv(data_file, cached).items())
+        df = pd.DataFrame({col: loaded[col] for col in wanted}, copy=False)
+
+    if parse_timestamps and 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
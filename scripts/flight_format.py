@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import csv
+import gzip
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+
+FIELDNAMES = ['size_rank', 'width_cm', 'height_cm', 'area_cm2',
+              'trial_number', 'distance_m', 'timestamp', 'notes']
+
+BINARY_SUFFIX = '.ppf'
+RAW_SUFFIXES = ('.csv', '.csv.gz', BINARY_SUFFIX)
+
+MAGIC = b'PPFD'
+VERSION = 1
+HEADER = struct.Struct('<4sHIQI')
+SIZE_ENTRY = struct.Struct('<hddd')
+LENGTH = struct.Struct('<H')
+NOTE_ENTRY = struct.Struct('<QH')
+COUNT = struct.Struct('<Q')
+COLUMNS = (('size_rank', 'h'), ('trial_number', 'i'), ('distance_m', 'f'), ('timestamp_id', 'I'))
+CHUNK_ROWS = 65536
+
+
+def open_text(filename, mode='r'):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't', newline='', encoding='utf-8')
+    return open(filename, mode, newline='', encoding='utf-8')
+
+
+def _write_column(f, values, typecode):
+    column = values if values.typecode == typecode else array(typecode, values)
+    if sys.byteorder != 'little':
+        column = array(typecode, column)
+        column.byteswap()
+    column.tofile(f)
+
+
+def write_flight_binary(filename, size_rank, trial_number, distance_m, timestamp_id, timestamps, notes, dimensions):
+    sizes = sorted(dimensions)
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sizes), len(distance_m), len(timestamps)))
+        for size in sizes:
+            f.write(SIZE_ENTRY.pack(size, *dimensions[size]))
+        for timestamp in timestamps:
+            encoded = timestamp.encode('utf-8')
+            f.write(LENGTH.pack(len(encoded)) + encoded)
+        for (_, typecode), values in zip(COLUMNS, (size_rank, trial_number, distance_m, timestamp_id)):
+            _write_column(f, values, typecode)
+        f.write(COUNT.pack(len(notes)))
+        for index in sorted(notes):
+            encoded = notes[index].encode('utf-8')
+            f.write(NOTE_ENTRY.pack(index, len(encoded)) + encoded)
+
+
+def _read_header(f):
+    magic, version, n_sizes, n_rows, n_timestamps = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{f.name} is not a version {VERSION} flight binary file")
+    dimensions = {}
+    for _ in range(n_sizes):
+        size, width, height, area = SIZE_ENTRY.unpack(f.read(SIZE_ENTRY.size))
+        dimensions[size] = (width, height, area)
+    timestamps = []
+    for _ in range(n_timestamps):
+        (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        timestamps.append(f.read(length).decode('utf-8'))
+    return n_rows, dimensions, timestamps
+
+
+def _read_column(f, offset, typecode, start, count):
+    column = array(typecode)
+    f.seek(offset + start * column.itemsize)
+    column.fromfile(f, count)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column
+
+
+def iter_flight_binary(filename, chunk_rows=CHUNK_ROWS):
+    with open(filename, 'rb') as f:
+        n_rows, dimensions, timestamps = _read_header(f)
+        offsets = {}
+        offset = f.tell()
+        for name, typecode in COLUMNS:
+            offsets[name] = offset
+            offset += n_rows * array(typecode).itemsize
+        f.seek(offset)
+        (n_notes,) = COUNT.unpack(f.read(COUNT.size))
+        notes = {}
+        for _ in range(n_notes):
+            index, length = NOTE_ENTRY.unpack(f.read(NOTE_ENTRY.size))
+            notes[index] = f.read(length).decode('utf-8')
+
+        for start in range(0, n_rows, chunk_rows):
+            count = min(chunk_rows, n_rows - start)
+            sizes, trials, distances, ts_ids = (_read_column(f, offsets[name], typecode, start, count)
+                                                for name, typecode in COLUMNS)
+            for i, (size, trial, distance, ts_id) in enumerate(zip(sizes, trials, distances, ts_ids), start):
+                width, height, area = dimensions[size]
+                yield {
+                    'size_rank': size,
+                    'width_cm': width,
+                    'height_cm': height,
+                    'area_cm2': area,
+                    'trial_number': trial,
+                    'distance_m': round(distance, 2),
+                    'timestamp': timestamps[ts_id],
+                    'notes': notes.get(i, "")
+                }
+
+
+@contextmanager
+def open_raw_rows(filename):
+    if filename.endswith(BINARY_SUFFIX):
+        yield iter_flight_binary(filename)
+        return
+    with open_text(filename) as f:
+        yield csv.DictReader(f)
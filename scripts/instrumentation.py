@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+TRACE_ENV = 'PAPERPLANE_TRACE'
+OWNER_ENV = 'PAPERPLANE_TRACE_OWNER'
+DEFAULT_TRACE_FILE = 'paperplane_trace.json'
+
+_trace_setting = os.environ.get(TRACE_ENV, '')
+TRACE_FILE = (DEFAULT_TRACE_FILE if _trace_setting == '1' else _trace_setting) or None
+ENABLED = TRACE_FILE is not None
+
+_spans = []
+_counters = {}
+_stack = threading.local()
+_origin = time.perf_counter()
+
+
+def _active():
+    if not hasattr(_stack, 'frames'):
+        _stack.frames = []
+    return _stack.frames
+
+
+@contextmanager
+def span(name, rows=None):
+    if not ENABLED:
+        yield {}
+        return
+    frames = _active()
+    if frames:
+        frames[-1]['peak'] = max(frames[-1]['peak'], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    record = {'name': name, 'rows': rows, 'depth': len(frames), 'pid': os.getpid(),
+              'tid': threading.get_ident()}
+    frame = {'peak': 0, 'record': record}
+    frames.append(frame)
+    start, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall_s'] = time.perf_counter() - start
+        record['cpu_s'] = time.process_time() - cpu
+        record['start_s'] = start - _origin
+        frames.pop()
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        record['peak_alloc_bytes'] = peak - base
+        if frames:
+            frames[-1]['peak'] = max(frames[-1]['peak'], peak)
+        _spans.append(record)
+
+
+def set_rows(count):
+    if ENABLED:
+        frames = _active()
+        if frames:
+            frames[-1]['record']['rows'] = count
+
+
+def instrument(name=None, rows=None):
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label) as record:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    record['rows'] = rows(args, result)
+                return result
+        return wrapper
+    return decorate
+
+
+def instrument_methods(cls, names, rows=None):
+    if not ENABLED:
+        return cls
+    for method in names:
+        setattr(cls, method, instrument(f"{cls.__name__}.{method}", rows)(getattr(cls, method)))
+    return cls
+
+
+def _counted(label, func):
+    totals = _counters.setdefault(label, {'calls': 0, 'wall_s': 0.0})
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            totals['calls'] += 1
+            totals['wall_s'] += time.perf_counter() - start
+    return wrapper
+
+
+def count_calls(cls, names):
+    if not ENABLED:
+        return cls
+    for method in names:
+        setattr(cls, method, _counted(f"{cls.__name__}.{method}", getattr(cls, method)))
+    return cls
+
+
+def export_spans(filename=None):
+    filename = filename or TRACE_FILE
+    spans = sorted(_spans, key=lambda s: s['start_s'])
+    counters = {label: totals for label, totals in _counters.items() if totals['calls']}
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'spans': spans, 'counters': counters}, f, indent=2)
+    events = [{'name': s['name'], 'ph': 'X', 'ts': s['start_s'] * 1e6, 'dur': s['wall_s'] * 1e6,
+               'pid': s['pid'], 'tid': s['tid'],
+               'args': {'cpu_s': s['cpu_s'], 'peak_alloc_bytes': s['peak_alloc_bytes'], 'rows': s['rows']}}
+              for s in spans]
+    end = (time.perf_counter() - _origin) * 1e6
+    events += [{'name': label, 'ph': 'C', 'ts': end, 'pid': os.getpid(), 'args': totals}
+               for label, totals in counters.items()]
+    chrome_file = os.path.splitext(filename)[0] + '.chrome.json'
+    with open(chrome_file, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return filename, chrome_file
+
+
+def _export_at_exit():
+    if (_spans or any(totals['calls'] for totals in _counters.values())) and os.environ.get(OWNER_ENV) == str(os.getpid()):
+        export_spans()
+
+
+if ENABLED:
+    os.environ.setdefault(OWNER_ENV, str(os.getpid()))
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    atexit.register(_export_at_exit)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import math
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.005
+MAX_BUCKETS = 2048
+RESERVOIR_SIZE = 256
+TAIL_SIZE = 32
+MIN_POSITIVE = 1e-9
+
+
+class QuantileSketch:
+    __slots__ = ('alpha', 'gamma', 'log_gamma', 'offset', 'counts', 'zero_count',
+                 'count', 'total', 'min', 'max', 'reservoir_keys', 'reservoir', 'low_tail', 'high_tail')
+
+    def __init__(self, alpha=RELATIVE_ACCURACY):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.reservoir_keys = np.zeros(0)
+        self.reservoir = np.zeros(0)
+        self.low_tail = np.zeros(0)
+        self.high_tail = np.zeros(0)
+
+    def _add_buckets(self, keys, counts):
+        if not len(keys):
+            return
+        lo = min(keys.min(), self.offset) if len(self.counts) else keys.min()
+        hi = max(keys.max(), self.offset + len(self.counts) - 1) if len(self.counts) else keys.max()
+        merged = np.zeros(hi - lo + 1, dtype=np.int64)
+        merged[self.offset - lo:self.offset - lo + len(self.counts)] += self.counts
+        np.add.at(merged, keys - lo, counts)
+        if len(merged) > MAX_BUCKETS:
+            collapse = len(merged) - MAX_BUCKETS
+            merged[collapse] += merged[:collapse].sum()
+            merged = merged[collapse:]
+            lo += collapse
+        self.offset, self.counts = int(lo), merged
+
+    def _keep_samples(self, keys, values):
+        keys = np.concatenate([self.reservoir_keys, keys])
+        values = np.concatenate([self.reservoir, values])
+        if len(keys) > RESERVOIR_SIZE:
+            keep = np.argpartition(keys, RESERVOIR_SIZE)[:RESERVOIR_SIZE]
+            keys, values = keys[keep], values[keep]
+        self.reservoir_keys, self.reservoir = keys, values
+
+    def _keep_tails(self, values):
+        low = np.concatenate([self.low_tail, values])
+        high = np.concatenate([self.high_tail, values])
+        self.low_tail = np.sort(low)[:TAIL_SIZE]
+        self.high_tail = np.sort(high)[-TAIL_SIZE:]
+
+    def add_many(self, values, rng=None):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+        positive = values > MIN_POSITIVE
+        keys, counts = np.unique(np.ceil(np.log(values[positive]) / self.log_gamma).astype(np.int64),
+                                 return_counts=True)
+        self._add_buckets(keys, counts)
+        self.zero_count += int((~positive).sum())
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        rng = rng if rng is not None else np.random.default_rng()
+        self._keep_samples(rng.random(len(values)), values)
+        self._keep_tails(values)
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self._add_buckets(np.arange(other.offset, other.offset + len(other.counts)), other.counts)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._keep_samples(other.reservoir_keys, other.reservoir)
+        self._keep_tails(np.concatenate([other.low_tail, other.high_tail]))
+        return self
+
+    def copy(self):
+        sketch = QuantileSketch(self.alpha)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(sketch, name, value.copy() if isinstance(value, np.ndarray) else value)
+        return sketch
+
+    def _value(self, key):
+        return min(max(2 * self.gamma ** key / (self.gamma + 1), self.min), self.max)
+
+    def _rank_value(self, rank):
+        if rank < len(self.low_tail):
+            return float(self.low_tail[rank])
+        if self.count - 1 - rank < len(self.high_tail):
+            return float(self.high_tail[rank - self.count])
+        if rank < self.zero_count:
+            return min(max(self.min, 0.0), self.max)
+        position = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side='right'))
+        return self._value(self.offset + min(position, len(self.counts) - 1))
+
+    def quantile(self, q):
+        if self.count == 0:
+            return math.nan
+        if len(self.reservoir) == self.count:
+            return float(np.quantile(self.reservoir, q))
+        rank = q * (self.count - 1)
+        below = int(math.floor(rank))
+        lower = self._rank_value(below)
+        if below == rank:
+            return lower
+        return lower + (rank - below) * (self._rank_value(below + 1) - lower)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def _bucket_values(self):
+        keys = np.flatnonzero(self.counts) + self.offset
+        return np.clip(2 * self.gamma ** keys / (self.gamma + 1), self.min, self.max)
+
+    def box_stats(self, whis=1.5, label=None):
+        exact = len(self.reservoir) == self.count
+        if exact:
+            seen = np.sort(self.reservoir)
+            q1, med, q3 = np.percentile(seen, [25, 50, 75])
+        else:
+            seen = np.unique(np.concatenate([self.reservoir, self.low_tail, self.high_tail, [self.min, self.max]]))
+            q1, med, q3 = (self.quantile(q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        lo_bound, hi_bound = q1 - whis * iqr, q3 + whis * iqr
+        inside = seen[(seen >= lo_bound) & (seen <= hi_bound)]
+        whislo = float(inside.min()) if len(inside) else q1
+        whishi = float(inside.max()) if len(inside) else q3
+        if not exact:
+            estimates = self._bucket_values()
+            estimates = estimates[(estimates >= lo_bound) & (estimates <= hi_bound)]
+            if len(estimates) and not self.low_tail[-1] >= lo_bound:
+                whislo = max(min(whislo, float(estimates.min())), lo_bound)
+            if len(estimates) and not self.high_tail[0] <= hi_bound:
+                whishi = min(max(whishi, float(estimates.max())), hi_bound)
+        whislo, whishi = min(whislo, q1), max(whishi, q3)
+        half_width = 1.57 * iqr / math.sqrt(self.count)
+        return {
+            'label': label,
+            'mean': self.mean,
+            'med': med,
+            'q1': q1,
+            'q3': q3,
+            'cilo': med - half_width,
+            'cihi': med + half_width,
+            'whislo': whislo,
+            'whishi': whishi,
+            'fliers': seen[(seen < whislo) | (seen > whishi)]
+        }
+
+    def to_state(self):
+        return {
+            'alpha': self.alpha, 'offset': self.offset, 'counts': self.counts.tolist(),
+            'zero_count': self.zero_count, 'count': self.count, 'total': self.total,
+            'min': self.min, 'max': self.max, 'reservoir_keys': self.reservoir_keys.tolist(),
+            'reservoir': self.reservoir.tolist(), 'low_tail': self.low_tail.tolist(),
+            'high_tail': self.high_tail.tolist()
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state['alpha'])
+        sketch.offset = state['offset']
+        sketch.counts = np.array(state['counts'], dtype=np.int64)
+        sketch.zero_count, sketch.count, sketch.total = state['zero_count'], state['count'], state['total']
+        sketch.min, sketch.max = state['min'], state['max']
+        for name in ('reservoir_keys', 'reservoir', 'low_tail', 'high_tail'):
+            setattr(sketch, name, np.array(state[name], dtype=np.float64))
+        return sketch
+
+
+def sketch_groups(sizes, offsets, distances, seed=0):
+    rng = np.random.default_rng(seed)
+    return {int(size): QuantileSketch().add_many(distances[offsets[i]:offsets[i + 1]], rng)
+            for i, size in enumerate(sizes)}
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+import argparse
+import time
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+from flight_data import load_flight_data, widen_float32
+
+MODELS = {
+    'linear': {'log_x': False, 'log_y': False},
+    'power': {'log_x': True, 'log_y': True},
+    'poly': {'log_x': False, 'log_y': False},
+}
+
+
+class Basis:
+    def __init__(self, model, x, degree):
+        self.model = model
+        self.degree = degree if model == 'poly' else 1
+        self.log_x = MODELS[model]['log_x']
+        self.log_y = MODELS[model]['log_y']
+        x = np.log(x) if self.log_x else x
+        self.center = float(np.mean(x))
+        self.scale = float(np.std(x)) or 1.0
+
+    @property
+    def n_params(self):
+        return self.degree + 1
+
+    def transform(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if self.log_x:
+            valid &= x > 0
+        if self.log_y:
+            valid &= y > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = ((np.log(x) if self.log_x else x) - self.center) / self.scale
+            response = np.log(y) if self.log_y else y
+        return z, response, valid
+
+    def to_original(self):
+        p = self.n_params
+        T = np.zeros((p, p))
+        for k in range(p):
+            for j in range(k + 1):
+                T[j, k] = comb(k, j) * (-self.center) ** (k - j) / self.scale ** k
+        return T
+
+
+def feature_columns(z, response, degree):
+    powers = np.vander(z, 2 * degree + 1, increasing=True)
+    cross = powers[:, :degree + 1] * response[:, None]
+    return np.column_stack([powers, cross, response * response])
+
+
+def sufficient_statistics(features, groups=None, n_groups=None, weights=None):
+    if weights is not None:
+        return weights @ features
+    if groups is None:
+        return features.sum(axis=0)[None, :]
+    return np.column_stack([np.bincount(groups, weights=features[:, j], minlength=n_groups)
+                            for j in range(features.shape[1])])
+
+
+def solve_stacked(sums, degree, transform=None):
+    p = degree + 1
+    moments = sums[:, :2 * degree + 1]
+    xty = sums[:, 2 * degree + 1:2 * degree + 1 + p]
+    yty = sums[:, -1]
+    n = moments[:, 0]
+    index = np.add.outer(np.arange(p), np.arange(p))
+    xtx = moments[:, index]
+
+    solvable = (n > p) & (np.linalg.matrix_rank(xtx) == p)
+    inverse = np.full_like(xtx, np.nan)
+    if solvable.any():
+        inverse[solvable] = np.linalg.inv(xtx[solvable])
+    beta = np.einsum('sij,sj->si', inverse, xty)
+    sse = np.maximum(yty - np.einsum('si,si->s', beta, xty), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma2 = sse / (n - p)
+        sst = yty - xty[:, 0] ** 2 / n
+        r_squared = 1.0 - sse / sst
+    cov = inverse * sigma2[:, None, None]
+    if transform is not None:
+        beta = beta @ transform.T
+        cov = transform @ cov @ transform.T
+    return {
+        'n': n.astype(np.int64),
+        'coefficients': beta,
+        'std_errors': np.sqrt(np.einsum('sii->si', cov)),
+        'r_squared': r_squared,
+        'rmse': np.sqrt(sigma2)
+    }
+
+
+def fit_subsets(model, x, y, groups=None, degree=2):
+    basis = Basis(model, np.asarray(x, dtype=np.float64), degree)
+    z, response, valid = basis.transform(x, y)
+    n_groups = None
+    if groups is not None:
+        groups = np.asarray(groups)
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        groups = groups[valid]
+    features = feature_columns(z[valid], response[valid], basis.degree)
+    sums = sufficient_statistics(features, groups, n_groups)
+    return solve_stacked(sums, basis.degree, basis.to_original())
+
+
+def bootstrap_fits(model, x, y, n_replicates, seed=None, degree=2, chunk_elements=2**22):
+    basis = Basis(model, np.asarray(x, dtype=np.float64), degree)
+    z, response, valid = basis.transform(x, y)
+    features = feature_columns(z[valid], response[valid], basis.degree)
+    n = len(features)
+    rng = np.random.default_rng(seed)
+    chunk = max(1, chunk_elements // max(n, 1))
+
+    sums = []
+    for start in range(0, n_replicates, chunk):
+        count = min(chunk, n_replicates - start)
+        draws = rng.integers(0, n, size=(count, n))
+        draws += (np.arange(count) * n)[:, None]
+        weights = np.bincount(draws.ravel(), minlength=count * n).reshape(count, n).astype(np.float64)
+        sums.append(sufficient_statistics(features, weights=weights))
+    return solve_stacked(np.vstack(sums), basis.degree, basis.to_original())
+
+
+def fits_table(model, fits, labels):
+    table = pd.DataFrame({'model': model, 'subset': labels, 'n': fits['n']})
+    for k in range(fits['coefficients'].shape[1]):
+        table[f'b{k}'] = fits['coefficients'][:, k]
+    for k in range(fits['std_errors'].shape[1]):
+        table[f'se{k}'] = fits['std_errors'][:, k]
+    table['r_squared'] = fits['r_squared']
+    table['rmse'] = fits['rmse']
+    return table
+
+
+def describe_fit(model, coefficients):
+    if model == 'power':
+        return f"distance = {np.exp(coefficients[0]):.4f} * area^{coefficients[1]:.4f}"
+    terms = [f"{coefficients[0]:.4f}"] + [f"{c:+.4f}*x" + (f"^{k}" if k > 1 else "")
+                                          for k, c in enumerate(coefficients[1:], 1)]
+    return "distance = " + " ".join(terms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched closed-form regression of flight distance on plane size")
+    parser.add_argument("--data", default="../Data/raw_flight_data.csv", help="Raw long-format CSV")
+    parser.add_argument("--models", nargs='+', choices=list(MODELS), default=list(MODELS), help="Models to fit")
+    parser.add_argument("--x", default="size_rank", choices=["size_rank", "area_cm2"],
+                        help="Predictor for the linear and polynomial models (power law always uses area_cm2)")
+    parser.add_argument("--degree", type=int, default=2, help="Polynomial degree")
+    parser.add_argument("--by", nargs='+', default=None,
+                        help="Fit one model per subset defined by these raw data columns (e.g. timestamp, notes)")
+    parser.add_argument("--bootstrap", type=int, default=0, help="Bootstrap replicates of the pooled fit")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for bootstrap resampling")
+    parser.add_argument("--output", default=None, help="Write every fit to this CSV")
+    args = parser.parse_args()
+
+    if args.by:
+        available = list(pd.read_csv(args.data, nrows=0).columns)
+        unknown = [col for col in args.by if col not in available]
+        if unknown:
+            parser.error(f"--by columns not in {args.data}: {', '.join(unknown)} (available: {', '.join(available)})")
+    columns = list(dict.fromkeys(['size_rank', 'area_cm2', 'distance_m'] + (args.by or [])))
+    df = load_flight_data(args.data, columns)
+    y = widen_float32(df['distance_m'].to_numpy())
+    predictors = {'size_rank': df['size_rank'].to_numpy(np.float64), 'area_cm2': widen_float32(df['area_cm2'].to_numpy())}
+    if args.by:
+        groups = df.groupby(args.by, sort=True, dropna=False).ngroup().to_numpy()
+        labels = df.groupby(args.by, sort=True, dropna=False).size().index.map(
+            lambda key: '|'.join(map(str, key)) if isinstance(key, tuple) else str(key))
+    print("="*80)
+    print("REGRESSION: FLIGHT DISTANCE VS. PLANE SIZE")
+    print("="*80)
+    print(f"Observations: {len(df)}")
+
+    tables = []
+    for model in args.models:
+        x = predictors['area_cm2' if model == 'power' else args.x]
+        pooled = fit_subsets(model, x, y, degree=args.degree)
+        coefficients = pooled['coefficients'][0]
+        print(f"\n{model.upper()} ({'log-log on area_cm2' if model == 'power' else args.x})")
+        print("-"*80)
+        print(describe_fit(model, coefficients))
+        print("Coefficients: " + ", ".join(f"b{k} = {c:.4f} (SE {se:.4f})" for k, (c, se) in
+                                            enumerate(zip(coefficients, pooled['std_errors'][0]))))
+        print(f"R-squared{' (log scale)' if model == 'power' else ''}: {pooled['r_squared'][0]:.4f}")
+        tables.append(fits_table(model, pooled, ['all']))
+
+        if args.by:
+            start = time.perf_counter()
+            fits = fit_subsets(model, x, y, groups, args.degree)
+            elapsed = time.perf_counter() - start
+            print(f"Per-subset fits ({' x '.join(args.by)}): {len(labels)} in {elapsed:.3f}s, "
+                  f"median R-squared {np.nanmedian(fits['r_squared']):.4f}")
+            tables.append(fits_table(model, fits, labels))
+
+        if args.bootstrap:
+            start = time.perf_counter()
+            fits = bootstrap_fits(model, x, y, args.bootstrap, args.seed, args.degree)
+            elapsed = time.perf_counter() - start
+            lo, hi = np.nanpercentile(fits['coefficients'], [2.5, 97.5], axis=0)
+            print(f"Bootstrap fits: {args.bootstrap} in {elapsed:.3f}s")
+            print("Bootstrap 95% CI: " + ", ".join(f"b{k} [{a:.4f}, {b:.4f}]" for k, (a, b) in enumerate(zip(lo, hi))))
+            tables.append(fits_table(model, fits, [f'bootstrap_{i}' for i in range(args.bootstrap)]))
+
+    if args.output:
+        pd.concat(tables, ignore_index=True).to_csv(args.output, index=False)
+        print(f"\nFits written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
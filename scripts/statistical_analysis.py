@@ -1,15 +1,547 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import functools
+import hashlib
+import io
+import os
+import pickle
+import sys
 import pandas as pd
 import numpy as np
 from scipy import stats
-from scipy.stats import f_oneway, shapiro, levene, pearsonr
+from scipy.stats import shapiro, levene, pearsonr, studentized_range
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from data_cleaning import aggregate_file, load_aggregates, merge_aggregates, resolve_input_files
+from flight_data import ANALYSIS_COLUMNS, cache_key, load_flight_data, widen_float32
+from flight_format import RAW_SUFFIXES
+from instrumentation import instrument_methods
+from quantile_sketch import sketch_groups
 warnings.filterwarnings('ignore')
 
+KEY_COMPARISONS = [(1, 2), (5, 6), (1, 6), (14, 15), (1, 15)]
+DIMENSION_COLUMNS = ['width_cm', 'height_cm', 'area_cm2']
+BOOTSTRAP_BINS = 2048
+BOOTSTRAP_SPAN = 6.0
+
+ANALYSIS_STEPS = {
+    'load_data': {'requires': (), 'results': None, 'params': ()},
+    'state_hypotheses': {'requires': (), 'results': None, 'params': ()},
+    'descriptive_statistics': {'requires': ('load_data',), 'results': 'descriptive', 'params': ()},
+    'check_assumptions': {'requires': ('load_data',), 'results': 'assumptions', 'params': ()},
+    'one_way_anova': {'requires': ('load_data',), 'results': 'anova', 'params': ()},
+    'effect_size': {'requires': ('load_data',), 'results': 'effect_size', 'params': ()},
+    'correlation_analysis': {'requires': ('load_data',), 'results': 'correlation', 'params': ()},
+    'post_hoc_tests': {'requires': ('load_data',), 'results': 'posthoc', 'params': ()},
+    'confidence_intervals': {'requires': ('load_data',), 'results': 'confidence_intervals', 'params': ()},
+    'resampling_inference': {'requires': ('load_data',), 'results': 'resampling', 'params': ('n_resamples', 'seed')},
+    'summary': {'requires': ('one_way_anova', 'effect_size', 'correlation_analysis'), 'results': None, 'params': ()},
+}
+
+STEP_ALIASES = {
+    'load': 'load_data',
+    'hypotheses': 'state_hypotheses',
+    'descriptive': 'descriptive_statistics',
+    'assumptions': 'check_assumptions',
+    'anova': 'one_way_anova',
+    'effect': 'effect_size',
+    'correlation': 'correlation_analysis',
+    'posthoc': 'post_hoc_tests',
+    'ci': 'confidence_intervals',
+    'resampling': 'resampling_inference',
+}
+
+SOURCE_MODULES = ('statistical_analysis', 'data_cleaning', 'flight_data', 'flight_format', 'quantile_sketch')
+
+_source_digest = hashlib.sha1()
+for _module in SOURCE_MODULES:
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{_module}.py'), 'rb') as _source:
+        _source_digest.update(_source.read())
+SOURCE_HASH = _source_digest.hexdigest()
+
+
+def resolve_steps(requested):
+    needed = set()
+    pending = [STEP_ALIASES.get(step, step) for step in requested]
+    while pending:
+        step = pending.pop()
+        if step not in ANALYSIS_STEPS:
+            raise ValueError(f"Unknown analysis step: {step}")
+        if step not in needed:
+            needed.add(step)
+            pending.extend(ANALYSIS_STEPS[step]['requires'])
+    return [step for step in ANALYSIS_STEPS if step in needed]
+
+
+class _Tee(io.TextIOBase):
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+class GroupIndex:
+    def __init__(self, size_rank, distance):
+        size_rank = np.asarray(size_rank)
+        order = np.argsort(size_rank, kind='stable')
+        self.distances = np.ascontiguousarray(widen_float32(np.asarray(distance)[order]))
+        self.sizes, starts, self.counts = np.unique(size_rank[order], return_index=True, return_counts=True)
+        self.offsets = np.append(starts, len(order))
+        self._position = {size: i for i, size in enumerate(self.sizes.tolist())}
+        self._summary = None
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def group(self, size):
+        i = self._position.get(size)
+        if i is None:
+            return self.distances[:0]
+        return self.distances[self.offsets[i]:self.offsets[i + 1]]
+
+    def groups(self):
+        return [self.distances[self.offsets[i]:self.offsets[i + 1]] for i in range(len(self))]
+
+    def group_ids(self):
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def summary(self):
+        if self._summary is None:
+            starts = self.offsets[:-1]
+            means = np.add.reduceat(self.distances, starts) / self.counts
+            ss = np.add.reduceat((self.distances - np.repeat(means, self.counts)) ** 2, starts)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variances = ss / (self.counts - 1)
+            self._summary = (self.counts, means, variances)
+        return self._summary
+
+    def extremes(self):
+        starts = self.offsets[:-1]
+        return np.minimum.reduceat(self.distances, starts), np.maximum.reduceat(self.distances, starts)
+
+    def sketches(self):
+        return sketch_groups(self.sizes, self.offsets, self.distances)
+
+
+class GroupSummary:
+    def __init__(self, aggregates):
+        self.sizes = np.array(sorted(aggregates), dtype=np.int64)
+        aggs = [aggregates[size] for size in self.sizes.tolist()]
+        self.counts = np.array([a.count for a in aggs], dtype=np.int64)
+        self.means = np.array([a.mean for a in aggs], dtype=np.float64)
+        self.m2 = np.array([a.m2 for a in aggs], dtype=np.float64)
+        self.minimum = np.array([a.min for a in aggs], dtype=np.float64)
+        self.maximum = np.array([a.max for a in aggs], dtype=np.float64)
+        self._dimensions = pd.DataFrame({col: np.array([getattr(a, col) for a in aggs], dtype=np.float64)
+                                         for col in DIMENSION_COLUMNS},
+                                        index=pd.Index(self.sizes, name='size_rank'))
+        self._sketches = {size: agg.sketch for size, agg in zip(self.sizes.tolist(), aggs)}
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def count(self, size):
+        position = np.searchsorted(self.sizes, size)
+        if position < len(self.sizes) and self.sizes[position] == size:
+            return int(self.counts[position])
+        return 0
+
+    def summary(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variances = self.m2 / (self.counts - 1)
+        return self.counts, self.means, variances
+
+    def extremes(self):
+        return self.minimum, self.maximum
+
+    def dimensions(self):
+        return self._dimensions
+
+    def sketches(self):
+        if any(sketch is None for sketch in self._sketches.values()):
+            raise ValueError("Aggregates were built without quantile sketches")
+        return self._sketches
+
+
+def batch_confidence_intervals(counts, means, variances, confidence=0.95):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = np.sqrt(variances / counts)
+    t_crit = stats.t.ppf((1 + confidence) / 2, counts - 1)
+    return means - t_crit * se, means + t_crit * se, se
+
+
+def interpret_eta_squared(eta_squared):
+    if eta_squared < 0.01:
+        return "negligible"
+    if eta_squared < 0.06:
+        return "small"
+    if eta_squared < 0.14:
+        return "medium"
+    return "large"
+
+
+def anova_from_summary(counts, means, variances):
+    counts, means, variances = (np.asarray(a, dtype=np.float64) for a in (counts, means, variances))
+    n_total, k = counts.sum(), len(counts)
+    grand_mean = (counts * means).sum() / n_total
+    ss_between = (counts * (means - grand_mean) ** 2).sum()
+    ss_within = np.nansum((counts - 1) * variances)
+    df_between, df_within = k - 1, int(n_total - k)
+    f_stat = (ss_between / df_between) / (ss_within / df_within)
+    anova = {
+        'f_statistic': f_stat,
+        'p_value': stats.f.sf(f_stat, df_between, df_within),
+        'df_between': df_between,
+        'df_within': df_within
+    }
+    return anova, ss_between / (ss_between + ss_within)
+
+
+def summary_statistics(sizes, counts, means, variances, confidence=0.95):
+    anova, eta_squared = anova_from_summary(counts, means, variances)
+    r, r_p = pearsonr(np.asarray(sizes, dtype=np.float64), means)
+    ci_lower, ci_upper, _ = batch_confidence_intervals(counts, means, variances, confidence)
+    return {
+        'n_observations': int(np.sum(counts)),
+        'n_groups': len(counts),
+        'anova': anova,
+        'eta_squared': eta_squared,
+        'correlation': {'r': r, 'p_value': r_p, 'r_squared': r**2},
+        'confidence_intervals': {'lower': ci_lower, 'upper': ci_upper}
+    }
+
+
+def _shapiro_chunk(groups):
+    return [tuple(shapiro(data)) for data in groups]
+
+
+def batch_shapiro(groups, workers=None, parallel_threshold=1000, chunk_size=250):
+    if len(groups) < parallel_threshold or workers == 1:
+        return _shapiro_chunk(groups)
+    chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for chunk in pool.map(_shapiro_chunk, chunks) for result in chunk]
+
+
+def _finite_order(p_values):
+    finite = np.flatnonzero(np.isfinite(p_values))
+    return finite[np.argsort(p_values[finite], kind='stable')]
+
+
+def holm_adjust(p_values):
+    p_values = np.asarray(p_values, dtype=np.float64)
+    order = _finite_order(p_values)
+    m = len(order)
+    adjusted = np.maximum.accumulate((m - np.arange(m)) * p_values[order])
+    result = np.full(len(p_values), np.nan)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def bh_adjust(p_values):
+    p_values = np.asarray(p_values, dtype=np.float64)
+    order = _finite_order(p_values)
+    m = len(order)
+    adjusted = np.minimum.accumulate((p_values[order] * m / np.arange(1, m + 1))[::-1])[::-1]
+    result = np.full(len(p_values), np.nan)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def pair_position(n_groups, i, j):
+    return i * (2 * n_groups - i - 1) // 2 + (j - i - 1)
+
+
+def condensed_to_matrix(values, n_groups, antisymmetric=False, diagonal=np.nan):
+    matrix = np.full((n_groups, n_groups), diagonal, dtype=float)
+    i, j = np.triu_indices(n_groups, k=1)
+    matrix[i, j] = values
+    matrix[j, i] = -values if antisymmetric else values
+    return matrix
+
+
+def pooled_t_test(n1, n2, mean_diff, var1, var2):
+    df = n1 + n2 - 2
+    pooled_var = ((n1 - 1) * var1 + (n2 - 1) * var2) / df
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = mean_diff / np.sqrt(pooled_var * (1.0 / n1 + 1.0 / n2))
+    return t_stat, df, 2 * stats.t.sf(np.abs(t_stat), df)
+
+
+def all_pairs_posthoc(sizes, counts, means, variances, alpha=0.05, tukey_pvalue_limit=200):
+    n_groups = len(sizes)
+    i, j = np.triu_indices(n_groups, k=1)
+    n1, n2 = counts[i], counts[j]
+    mean_diff = means[i] - means[j]
+    
+    t_stat, df, p_value = pooled_t_test(n1, n2, mean_diff, variances[i], variances[j])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cohens_d = mean_diff / np.sqrt((variances[i] + variances[j]) / 2)
+    
+    df_within = counts.sum() - n_groups
+    mse = np.nansum((counts - 1) * variances) / df_within
+    q_stat = np.abs(mean_diff) / np.sqrt(mse / 2 * (1.0 / n1 + 1.0 / n2))
+    q_crit = studentized_range.ppf(1 - alpha, n_groups, df_within)
+    p_tukey = studentized_range.sf(q_stat, n_groups, df_within) if len(q_stat) <= tukey_pvalue_limit else None
+    
+    p_holm = holm_adjust(p_value)
+    p_bh = bh_adjust(p_value)
+    return {
+        'sizes': sizes,
+        'alpha': alpha,
+        'mean_diff': mean_diff,
+        't_stat': t_stat,
+        'df': df,
+        'p_value': p_value,
+        'p_holm': p_holm,
+        'p_bh': p_bh,
+        'cohens_d': cohens_d,
+        'q_stat': q_stat,
+        'q_crit': q_crit,
+        'p_tukey': p_tukey,
+        'reject_holm': p_holm < alpha,
+        'reject_bh': p_bh < alpha,
+        'reject_tukey': q_stat > q_crit
+    }
+
+
+class FlightStatistics:
+    def __init__(self, group_index, frame=None):
+        self.index = group_index
+        self.frame = frame
+        self.sizes = group_index.sizes
+        self._pair_tests = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(GroupIndex(df['size_rank'].to_numpy(), df['distance_m'].to_numpy()), df)
+
+    @functools.cached_property
+    def summary(self):
+        return self.index.summary()
+
+    @property
+    def counts(self):
+        return self.summary[0]
+
+    @property
+    def means(self):
+        return self.summary[1]
+
+    @property
+    def variances(self):
+        return self.summary[2]
+
+    @functools.cached_property
+    def std(self):
+        return np.sqrt(self.variances)
+
+    @functools.cached_property
+    def extremes(self):
+        return self.index.extremes()
+
+    @functools.cached_property
+    def box_stats(self):
+        sketches = self.index.sketches()
+        return [sketches[size].box_stats(label=size) for size in self.sizes.tolist()]
+
+    @functools.cached_property
+    def confidence_intervals(self):
+        return batch_confidence_intervals(*self.summary)
+
+    @functools.cached_property
+    def _anova(self):
+        return anova_from_summary(*self.summary)
+
+    @property
+    def anova(self):
+        return self._anova[0]
+
+    @property
+    def eta_squared(self):
+        return self._anova[1]
+
+    @functools.cached_property
+    def correlation(self):
+        return pearsonr(self.sizes, self.means)
+
+    @functools.cached_property
+    def trend(self):
+        return stats.linregress(self.sizes, self.means)
+
+    @functools.cached_property
+    def posthoc(self):
+        return all_pairs_posthoc(self.sizes, *self.summary)
+
+    @functools.cached_property
+    def dimensions(self):
+        if self.frame is None:
+            return self.index.dimensions()
+        dims = self.frame.groupby('size_rank', sort=True)[['width_cm', 'height_cm', 'area_cm2']].first()
+        return pd.DataFrame({col: widen_float32(dims[col].to_numpy()) for col in dims.columns}, index=dims.index)
+
+    def pair_test(self, size1, size2):
+        key = (size1, size2)
+        if key not in self._pair_tests:
+            i, j = np.searchsorted(self.sizes, [size1, size2])
+            if i >= len(self.sizes) or j >= len(self.sizes) or self.sizes[i] != size1 or self.sizes[j] != size2:
+                return np.nan, np.nan, np.nan
+            (n1, n2), (m1, m2), (v1, v2) = (arr[[i, j]] for arr in self.summary)
+            t_stat, _, p_value = pooled_t_test(n1, n2, m1 - m2, v1, v2)
+            self._pair_tests[key] = (t_stat, p_value, m1 - m2)
+        return self._pair_tests[key]
+
+    def precompute(self, *names):
+        for name in names:
+            getattr(self, name)
+
+
+_RESAMPLE_DATA = {}
+
+
+def _init_resampling(distances, counts):
+    _RESAMPLE_DATA['distances'] = distances
+    _RESAMPLE_DATA['counts'] = counts
+    _RESAMPLE_DATA['group_ids'] = np.repeat(np.arange(len(counts)), counts)
+    _RESAMPLE_DATA['starts'] = np.repeat(np.cumsum(counts) - counts, counts)
+
+
+def _replicate_group_sums(labels, values, n_groups):
+    rows = labels.shape[0]
+    flat = (labels + n_groups * np.arange(rows)[:, None]).ravel()
+    return np.bincount(flat, weights=values.ravel(), minlength=rows * n_groups).reshape(rows, n_groups)
+
+
+def _permutation_chunk(task):
+    seed_seq, rows = task
+    rng = np.random.default_rng(seed_seq)
+    distances, counts, group_ids = _RESAMPLE_DATA['distances'], _RESAMPLE_DATA['counts'], _RESAMPLE_DATA['group_ids']
+    labels = rng.permuted(np.broadcast_to(group_ids, (rows, len(group_ids))), axis=1)
+    sums = _replicate_group_sums(labels, np.broadcast_to(distances, labels.shape), len(counts))
+    return (sums ** 2 / counts).sum(axis=1)
+
+
+def _bootstrap_chunk(task):
+    seed_seq, rows = task
+    rng = np.random.default_rng(seed_seq)
+    distances, counts, group_ids = _RESAMPLE_DATA['distances'], _RESAMPLE_DATA['counts'], _RESAMPLE_DATA['group_ids']
+    n = len(distances)
+    index = _RESAMPLE_DATA['starts'] + (rng.random((rows, n)) * np.repeat(counts, counts)).astype(np.int64)
+    values = distances[index]
+    means = _replicate_group_sums(np.broadcast_to(group_ids, values.shape), values, len(counts)) / counts
+    grand_mean = values.mean(axis=1)
+    ss_total = (values ** 2).sum(axis=1) - n * grand_mean ** 2
+    ss_between = (counts * means ** 2).sum(axis=1) - n * grand_mean ** 2
+    return ss_between / ss_total, means
+
+
+def _run_resampling(chunk_fn, group_index, n_resamples, seed, workers, chunk_elements):
+    if n_resamples < 1:
+        raise ValueError(f"n_resamples must be at least 1, got {n_resamples}")
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    n = len(group_index.distances)
+    rows = max(1, min(n_resamples, chunk_elements // max(n, 1)))
+    sizes = [min(rows, n_resamples - start) for start in range(0, n_resamples, rows)]
+    tasks = list(zip(seed.spawn(len(sizes)), sizes))
+    init_args = (group_index.distances, group_index.counts)
+    if workers == 1 or len(tasks) == 1:
+        _init_resampling(*init_args)
+        yield from map(chunk_fn, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_resampling, initargs=init_args) as pool:
+        yield from pool.map(chunk_fn, tasks)
+
+
+def permutation_anova(group_index, n_permutations=10000, seed=None, workers=None, chunk_elements=2**22):
+    counts, means, variances = group_index.summary()
+    n, n_groups = len(group_index.distances), len(counts)
+    total = group_index.distances.sum()
+    ss_total = ((group_index.distances - total / n) ** 2).sum()
+    observed = (counts * means ** 2).sum()
+    
+    permuted = np.concatenate(list(_run_resampling(_permutation_chunk, group_index, n_permutations,
+                                                   seed, workers, chunk_elements)))
+    ss_between = observed - total ** 2 / n
+    f_stat = (ss_between / (n_groups - 1)) / ((ss_total - ss_between) / (n - n_groups))
+    exceed = int((permuted >= observed * (1 - 1e-12)).sum())
+    return {
+        'f_statistic': f_stat,
+        'p_value': (exceed + 1) / (n_permutations + 1),
+        'n_permutations': n_permutations
+    }
+
+
+def _histogram_percentiles(hist, lower, width, percentiles):
+    cum = np.cumsum(hist, axis=1)
+    rows = np.arange(len(hist))
+    bounds = []
+    for q in percentiles:
+        target = q / 100 * cum[:, -1]
+        bins = np.minimum((cum < target[:, None]).sum(axis=1), hist.shape[1] - 1)
+        before = np.where(bins > 0, cum[rows, bins - 1], 0)
+        inside = hist[rows, bins]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(inside > 0, (target - before) / inside, 0.5)
+        bounds.append(lower + (bins + fraction) * width)
+    return np.array(bounds)
+
+
+def bootstrap_intervals(group_index, n_resamples=10000, confidence=0.95, seed=None, workers=None,
+                        chunk_elements=2**22, bins=BOOTSTRAP_BINS):
+    counts, means, variances = group_index.summary()
+    n_groups = len(counts)
+    half_width = BOOTSTRAP_SPAN * np.sqrt(np.nan_to_num(variances) / counts)
+    half_width = np.where(half_width > 0, half_width, 1.0)
+    lower, width = means - half_width, 2 * half_width / bins
+    hist = np.zeros(n_groups * bins, dtype=np.int32)
+    offsets = np.arange(n_groups) * bins
+    
+    x = group_index.sizes - group_index.sizes.mean()
+    eta_squared, r = [], []
+    for chunk_eta, chunk_means in _run_resampling(_bootstrap_chunk, group_index, n_resamples, seed, workers,
+                                                  chunk_elements):
+        eta_squared.append(chunk_eta)
+        centered = chunk_means - chunk_means.mean(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r.append(centered @ x / (np.sqrt((centered ** 2).sum(axis=1)) * np.sqrt((x ** 2).sum())))
+        positions = np.clip(((chunk_means - lower) / width).astype(np.int64), 0, bins - 1)
+        hist += np.bincount((positions + offsets).ravel(), minlength=len(hist))
+    
+    tail = (1 - confidence) / 2 * 100
+    bounds = (tail, 100 - tail)
+    return {
+        'confidence': confidence,
+        'n_resamples': n_resamples,
+        'eta_squared': tuple(np.percentile(np.concatenate(eta_squared), bounds)),
+        'pearson_r': tuple(np.nanpercentile(np.concatenate(r), bounds)),
+        'group_means': _histogram_percentiles(hist.reshape(n_groups, bins), lower, width, bounds)
+    }
+
+
 class PaperPlaneAnalysis:
-    def __init__(self, data_file):
+    def __init__(self, data_file, workers=None, parallel_threshold=1000, n_resamples=0, seed=None,
+                 cache_dir=None, data_cache_dir=None, columns=ANALYSIS_COLUMNS):
         self.data_file = data_file
+        self.columns = columns
+        self.cache_dir = cache_dir
+        self.data_cache_dir = data_cache_dir
+        self.workers = workers
+        self.n_resamples = n_resamples
+        self.seed = seed
+        self.parallel_threshold = parallel_threshold
         self.df = None
+        self.group_index = None
+        self.stats = None
         self.results = {}
         
     def load_data(self):
@@ -18,11 +550,13 @@ class PaperPlaneAnalysis:
         print("="*80)
         print("\n1. DATA LOADING")
         print("-"*80)
-        self.df = pd.read_csv(self.data_file)
+        self.df = load_flight_data(self.data_file, self.columns, cache_dir=self.data_cache_dir)
+        self.stats = FlightStatistics.from_frame(self.df)
+        self.group_index = self.stats.index
         print(f"Loaded data from: {self.data_file}")
         print(f"Total observations: {len(self.df)}")
-        print(f"Number of size groups: {self.df['size_rank'].nunique()}")
-        print(f"Trials per size: {len(self.df[self.df['size_rank']==1])}")
+        print(f"Number of size groups: {len(self.group_index)}")
+        print(f"Trials per size: {len(self.group_index.group(1))}")
         
     def state_hypotheses(self):
         print("\n2. HYPOTHESES")
@@ -39,17 +573,23 @@ class PaperPlaneAnalysis:
         print("\n3. DESCRIPTIVE STATISTICS")
         print("-"*80)
         
-        grouped = self.df.groupby('size_rank')['distance_m']
-        desc_stats = grouped.agg(['count', 'mean', 'std', 'min', 'max'])
+        counts, means, variances = self.stats.summary
+        minimum, maximum = self.stats.extremes
+        desc_stats = pd.DataFrame({'count': counts, 'mean': means, 'std': np.sqrt(variances),
+                                   'min': minimum, 'max': maximum},
+                                  index=pd.Index(self.group_index.sizes, name='size_rank'))
         
         print("\nSummary by Size:")
         print(desc_stats.to_string())
         
         self.results['descriptive'] = desc_stats
         
-        print(f"\nOverall mean: {self.df['distance_m'].mean():.2f}m")
-        print(f"Overall std: {self.df['distance_m'].std():.2f}m")
-        print(f"Overall range: [{self.df['distance_m'].min():.2f}, {self.df['distance_m'].max():.2f}]m")
+        n_total = counts.sum()
+        grand_mean = (counts * means).sum() / n_total
+        total_ss = np.nansum((counts - 1) * variances) + (counts * (means - grand_mean) ** 2).sum()
+        print(f"\nOverall mean: {grand_mean:.2f}m")
+        print(f"Overall std: {np.sqrt(total_ss / (n_total - 1)):.2f}m")
+        print(f"Overall range: [{minimum.min():.2f}, {maximum.max():.2f}]m")
         
     def check_assumptions(self):
         print("\n4. ASSUMPTION CHECKING")
@@ -59,9 +599,8 @@ class PaperPlaneAnalysis:
         print("H0: Data is normally distributed")
         normality_results = []
         
-        for size in sorted(self.df['size_rank'].unique()):
-            data = self.df[self.df['size_rank']==size]['distance_m']
-            stat, p_value = shapiro(data)
+        shapiro_results = batch_shapiro(self.group_index.groups(), self.workers, self.parallel_threshold)
+        for size, (stat, p_value) in zip(self.group_index.sizes, shapiro_results):
             normality_results.append({
                 'Size': size,
                 'W-statistic': stat,
@@ -78,8 +617,7 @@ class PaperPlaneAnalysis:
         print("\n4.2 Homogeneity of Variance (Levene's Test)")
         print("H0: All groups have equal variances")
         
-        groups = [self.df[self.df['size_rank']==size]['distance_m'].values 
-                  for size in sorted(self.df['size_rank'].unique())]
+        groups = self.group_index.groups()
         stat, p_value = levene(*groups)
         
         print(f"Levene's statistic: {stat:.4f}")
@@ -98,14 +636,12 @@ class PaperPlaneAnalysis:
         print("Test: One-way ANOVA")
         print("Purpose: Test if mean flight distance differs across size groups")
         
-        groups = [self.df[self.df['size_rank']==size]['distance_m'].values 
-                  for size in sorted(self.df['size_rank'].unique())]
-        
-        f_stat, p_value = f_oneway(*groups)
+        anova = self.stats.anova
+        f_stat, p_value = anova['f_statistic'], anova['p_value']
         
         print(f"\nF-statistic: {f_stat:.4f}")
         print(f"p-value: {p_value:.6f}")
-        print(f"Degrees of freedom: between = {len(groups)-1}, within = {len(self.df)-len(groups)}")
+        print(f"Degrees of freedom: between = {anova['df_between']}, within = {anova['df_within']}")
         
         if p_value < 0.05:
             print(f"\nDecision: REJECT null hypothesis (p < 0.05)")
@@ -114,35 +650,17 @@ class PaperPlaneAnalysis:
             print(f"\nDecision: FAIL TO REJECT null hypothesis (p >= 0.05)")
             print("Conclusion: No significant effect of size on flight distance.")
         
-        self.results['anova'] = {
-            'f_statistic': f_stat,
-            'p_value': p_value,
-            'df_between': len(groups)-1,
-            'df_within': len(self.df)-len(groups)
-        }
+        self.results['anova'] = anova
         
     def effect_size(self):
         print("\n6. EFFECT SIZE")
         print("-"*80)
         
-        grouped = self.df.groupby('size_rank')['distance_m']
-        grand_mean = self.df['distance_m'].mean()
-        
-        ss_between = sum(grouped.count() * (grouped.mean() - grand_mean)**2)
-        ss_total = sum((self.df['distance_m'] - grand_mean)**2)
-        
-        eta_squared = ss_between / ss_total
+        eta_squared = self.stats.eta_squared
         
         print(f"Eta-squared (η²): {eta_squared:.4f}")
         
-        if eta_squared < 0.01:
-            interpretation = "negligible"
-        elif eta_squared < 0.06:
-            interpretation = "small"
-        elif eta_squared < 0.14:
-            interpretation = "medium"
-        else:
-            interpretation = "large"
+        interpretation = interpret_eta_squared(eta_squared)
         
         print(f"Interpretation: {interpretation} effect size")
         print(f"Variance explained: {eta_squared*100:.2f}% of variance in flight distance")
@@ -158,11 +676,7 @@ class PaperPlaneAnalysis:
         print("-"*80)
         print("Pearson correlation: Size rank vs. Mean flight distance")
         
-        size_means = self.df.groupby('size_rank')['distance_m'].mean()
-        sizes = size_means.index.values
-        means = size_means.values
-        
-        r, p_value = pearsonr(sizes, means)
+        r, p_value = self.stats.correlation
         
         print(f"\nCorrelation coefficient (r): {r:.4f}")
         print(f"p-value: {p_value:.6f}")
@@ -189,66 +703,100 @@ class PaperPlaneAnalysis:
     def post_hoc_tests(self):
         print("\n8. POST-HOC ANALYSIS")
         print("-"*80)
-        print("Selected pairwise comparisons (independent t-tests):")
-        print("Comparing adjacent size groups and key comparisons")
+        print("All pairwise comparisons with multiplicity correction:")
+        print("Pooled t-tests with Holm and Benjamini-Hochberg adjustment, Tukey-Kramer HSD")
         
-        comparisons = [
-            (1, 2), (5, 6), (1, 6), (14, 15), (1, 15)
-        ]
+        sizes = self.stats.sizes
+        posthoc = self.stats.posthoc
+        n_pairs = len(posthoc['p_value'])
         
+        print(f"\nPairs compared: {n_pairs}")
+        print(f"Significant (unadjusted p < 0.05): {int((posthoc['p_value'] < 0.05).sum())}")
+        print(f"Significant (Holm): {int(posthoc['reject_holm'].sum())}")
+        print(f"Significant (Benjamini-Hochberg): {int(posthoc['reject_bh'].sum())}")
+        print(f"Significant (Tukey HSD, q > {posthoc['q_crit']:.3f}): {int(posthoc['reject_tukey'].sum())}")
+        
+        position = {size: k for k, size in enumerate(sizes.tolist())}
         results = []
-        for size1, size2 in comparisons:
-            group1 = self.df[self.df['size_rank']==size1]['distance_m']
-            group2 = self.df[self.df['size_rank']==size2]['distance_m']
-            
-            t_stat, p_value = stats.ttest_ind(group1, group2)
-            
-            mean_diff = group1.mean() - group2.mean()
-            
-            cohens_d = mean_diff / np.sqrt((group1.std()**2 + group2.std()**2) / 2)
-            
+        for size1, size2 in KEY_COMPARISONS:
+            if size1 not in position or size2 not in position:
+                continue
+            a, b = sorted((position[size1], position[size2]))
+            k = pair_position(len(sizes), a, b)
+            sign = 1 if position[size1] < position[size2] else -1
+            p_tukey = posthoc['p_tukey'][k] if posthoc['p_tukey'] is not None else np.nan
             results.append({
                 'Comparison': f'Size {size1} vs {size2}',
-                'Mean Diff': f'{mean_diff:.2f}',
-                't-stat': f'{t_stat:.3f}',
-                'p-value': f'{p_value:.4f}',
-                'Cohens d': f'{cohens_d:.3f}',
-                'Significant': 'Yes' if p_value < 0.05 else 'No'
+                'Mean Diff': f"{sign * posthoc['mean_diff'][k]:.2f}",
+                't-stat': f"{sign * posthoc['t_stat'][k]:.3f}",
+                'p-value': f"{posthoc['p_value'][k]:.4f}",
+                'p-Holm': f"{posthoc['p_holm'][k]:.4f}",
+                'p-BH': f"{posthoc['p_bh'][k]:.4f}",
+                'p-Tukey': f"{p_tukey:.4f}",
+                'Cohens d': f"{sign * posthoc['cohens_d'][k]:.3f}",
+                'Significant': 'Yes' if posthoc['reject_holm'][k] else 'No'
             })
         
-        results_df = pd.DataFrame(results)
-        print("\n" + results_df.to_string(index=False))
-        
-        print("\nNote: Bonferroni correction for multiple comparisons:")
-        print(f"      Adjusted α = 0.05 / {len(comparisons)} = {0.05/len(comparisons):.4f}")
+        if results:
+            print("\nKey comparisons (significance after Holm adjustment):")
+            print("\n" + pd.DataFrame(results).to_string(index=False))
         
-        self.results['posthoc'] = results_df
+        self.results['posthoc'] = posthoc
         
     def confidence_intervals(self):
         print("\n9. CONFIDENCE INTERVALS")
         print("-"*80)
         print("95% Confidence Intervals for mean flight distance by size:")
         
-        ci_results = []
-        for size in sorted(self.df['size_rank'].unique()):
-            data = self.df[self.df['size_rank']==size]['distance_m']
-            mean = data.mean()
-            se = stats.sem(data)
-            ci = stats.t.interval(0.95, len(data)-1, loc=mean, scale=se)
-            
-            ci_results.append({
-                'Size': size,
-                'Mean': f'{mean:.2f}',
-                '95% CI Lower': f'{ci[0]:.2f}',
-                '95% CI Upper': f'{ci[1]:.2f}',
-                'Width': f'{ci[1]-ci[0]:.2f}'
-            })
+        means = self.stats.means
+        ci_lower, ci_upper, _ = self.stats.confidence_intervals
         
-        ci_df = pd.DataFrame(ci_results)
+        ci_df = pd.DataFrame({
+            'Size': self.group_index.sizes,
+            'Mean': [f'{m:.2f}' for m in means],
+            '95% CI Lower': [f'{lo:.2f}' for lo in ci_lower],
+            '95% CI Upper': [f'{hi:.2f}' for hi in ci_upper],
+            'Width': [f'{hi-lo:.2f}' for lo, hi in zip(ci_lower, ci_upper)]
+        })
         print("\n" + ci_df.to_string(index=False))
         
         self.results['confidence_intervals'] = ci_df
         
+    def resampling_inference(self):
+        print("\n9b. RESAMPLING INFERENCE")
+        print("-"*80)
+        if self.n_resamples < 1:
+            print("Skipped: pass --resamples N to run permutation and bootstrap resampling")
+            self.results['resampling'] = None
+            return
+        print(f"Permutation ANOVA and stratified bootstrap ({self.n_resamples} resamples, seed = {self.seed})")
+        
+        perm_seed, boot_seed = np.random.SeedSequence(self.seed).spawn(2)
+        perm = permutation_anova(self.group_index, self.n_resamples, perm_seed, self.workers)
+        boot = bootstrap_intervals(self.group_index, self.n_resamples, seed=boot_seed, workers=self.workers)
+        
+        print(f"\nPermutation F-statistic: {perm['f_statistic']:.4f}")
+        print(f"Permutation p-value: {perm['p_value']:.6f}")
+        print(f"Bootstrap 95% CI for η²: [{boot['eta_squared'][0]:.4f}, {boot['eta_squared'][1]:.4f}]")
+        print(f"Bootstrap 95% CI for r: [{boot['pearson_r'][0]:.4f}, {boot['pearson_r'][1]:.4f}]")
+        
+        boot_df = pd.DataFrame({
+            'Size': self.group_index.sizes,
+            'Boot CI Lower': [f'{lo:.2f}' for lo in boot['group_means'][0]],
+            'Boot CI Upper': [f'{hi:.2f}' for hi in boot['group_means'][1]]
+        })
+        print("\n" + boot_df.to_string(index=False))
+        
+        self.results['resampling'] = {'permutation': perm, 'bootstrap': boot}
+        
+    def headless_results(self):
+        if self.stats is None:
+            self.df = load_flight_data(self.data_file, self.columns, cache_dir=self.data_cache_dir)
+            self.stats = FlightStatistics.from_frame(self.df)
+            self.group_index = self.stats.index
+        counts, means, variances = self.stats.summary
+        return self.stats.sizes, counts, means, summary_statistics(self.stats.sizes, counts, means, variances)
+        
     def summary(self):
         print("\n10. SUMMARY OF FINDINGS")
         print("="*80)
@@ -272,28 +820,137 @@ class PaperPlaneAnalysis:
         print(f"  shows a {self.results['correlation']['r']:.4f} correlation,")
         print("  indicating smaller planes tend to fly shorter distances.")
         
+    def _data_identity(self):
+        return cache_key(self.data_file)
+        
+    def _step_cache_file(self, step):
+        params = {name: getattr(self, name) for name in ANALYSIS_STEPS[step]['params']}
+        if 'seed' in params and params['seed'] is None and self.n_resamples:
+            return None
+        ident = f"{SOURCE_HASH}|{type(self).__name__}|{self._data_identity()}|{step}|{sorted(params.items())!r}"
+        return os.path.join(self.cache_dir, f"{step}-{hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]}.pkl")
+        
+    def run_step(self, step):
+        result_key = ANALYSIS_STEPS[step]['results']
+        cache_file = self._step_cache_file(step) if self.cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            sys.stdout.write(cached['output'])
+            if result_key:
+                self.results[result_key] = cached['result']
+            return
+        
+        if self.group_index is None and 'load_data' in ANALYSIS_STEPS[step]['requires']:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.load_data()
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(_Tee(sys.stdout, output)):
+            getattr(self, step)()
+        if cache_file:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_file + '.tmp', 'wb') as f:
+                pickle.dump({'output': output.getvalue(),
+                             'result': self.results.get(result_key) if result_key else None}, f)
+            os.replace(cache_file + '.tmp', cache_file)
+        
+    def run_steps(self, steps):
+        for step in resolve_steps(steps):
+            self.run_step(step)
+        
     def run_complete_analysis(self):
-        self.load_data()
-        self.state_hypotheses()
-        self.descriptive_statistics()
-        self.check_assumptions()
-        self.one_way_anova()
-        self.effect_size()
-        self.correlation_analysis()
-        self.post_hoc_tests()
-        self.confidence_intervals()
-        self.summary()
+        steps = [step for step in ANALYSIS_STEPS if step != 'resampling_inference' or self.n_resamples]
+        self.run_steps(steps)
         
         print("\n" + "="*80)
         print("ANALYSIS COMPLETE")
         print("="*80)
 
 
+def _aggregate_input(input_file):
+    if input_file.endswith('.json'):
+        aggregates = load_aggregates(input_file)
+        return sum(agg.count for agg in aggregates.values()), aggregates
+    return aggregate_file(input_file)
+
+
+class OutOfCoreAnalysis(PaperPlaneAnalysis):
+    def __init__(self, data_spec, workers=None, cache_dir=None):
+        super().__init__(data_spec, workers=workers, cache_dir=cache_dir)
+        self.input_files = resolve_input_files(data_spec, RAW_SUFFIXES + ('.json',))
+        
+    def _data_identity(self):
+        return '|'.join(cache_key(f) for f in self.input_files)
+        
+    def load_data(self):
+        print("="*80)
+        print("PAPER PLANE FLIGHT DISTANCE ANALYSIS (OUT-OF-CORE)")
+        print("="*80)
+        print("\n1. DATA LOADING")
+        print("-"*80)
+        if self.workers == 1 or len(self.input_files) <= 1:
+            partials = list(map(_aggregate_input, self.input_files))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                partials = list(pool.map(_aggregate_input, self.input_files))
+        self.group_index = GroupSummary(merge_aggregates(aggregates for _, aggregates in partials))
+        self.stats = FlightStatistics(self.group_index)
+        print(f"Aggregated {sum(rows for rows, _ in partials)} records from {len(self.input_files)} input files")
+        print(f"Total observations: {int(self.group_index.counts.sum())}")
+        print(f"Number of size groups: {len(self.group_index)}")
+        print(f"Trials per size: {self.group_index.count(1)}")
+        
+    def check_assumptions(self):
+        print("\n4. ASSUMPTION CHECKING")
+        print("-"*80)
+        print("Skipped: Shapiro-Wilk and Levene's tests need the raw observations")
+        
+    def resampling_inference(self):
+        print("\n9b. RESAMPLING INFERENCE")
+        print("-"*80)
+        print("Skipped: permutation and bootstrap resampling need the raw observations")
+
+
+def _observations(args, result):
+    stats = args[0].stats
+    return int(stats.counts.sum()) if stats is not None else None
+
+
+instrument_methods(PaperPlaneAnalysis, list(ANALYSIS_STEPS) + ['headless_results'], rows=_observations)
+instrument_methods(OutOfCoreAnalysis, ['load_data', 'check_assumptions', 'resampling_inference'], rows=_observations)
+
+
 def main():
-    data_file = "../Data/raw_flight_data.csv"
+    parser = argparse.ArgumentParser(description="Paper plane flight distance statistical analysis")
+    parser.add_argument("--data", default="../Data/raw_flight_data.csv", help="Raw long-format CSV")
+    parser.add_argument("--resamples", type=int, default=0, help="Permutation/bootstrap resamples (0 disables)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for permutation and bootstrap resampling")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for parallel steps")
+    parser.add_argument("--steps", nargs='+', default=None,
+                        help=f"Run only these steps and their prerequisites: {', '.join(list(ANALYSIS_STEPS) + list(STEP_ALIASES))}")
+    parser.add_argument("--cache-dir", default=None, help="Step result cache (default: .analysis_cache next to the data file)")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every step")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Stream --data (a file, directory or glob of raw shards or saved .json aggregates) "
+                             "into per-size sufficient statistics instead of loading it")
+    args = parser.parse_args()
+    if args.resamples < 0:
+        parser.error("--resamples must be zero or positive")
+    
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.data)), '.analysis_cache')
     
-    analysis = PaperPlaneAnalysis(data_file)
-    analysis.run_complete_analysis()
+    if args.out_of_core:
+        analysis = OutOfCoreAnalysis(args.data, workers=args.workers, cache_dir=cache_dir)
+    else:
+        analysis = PaperPlaneAnalysis(args.data, workers=args.workers, n_resamples=args.resamples, seed=args.seed,
+                                      cache_dir=cache_dir)
+    if args.steps:
+        analysis.run_steps(args.steps)
+    else:
+        analysis.run_complete_analysis()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+import csv
+import time
+
+from data_collection import PaperPlaneDataCollector
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_throw_after_idle_gap_gets_a_fresh_timestamp(tmp_path):
+    path = str(tmp_path / 'flights.csv')
+    collector = PaperPlaneDataCollector()
+    with collector.stream_to_csv(path, flush_seconds=0.5, progress_seconds=3600, autoflush=False) as recorder:
+        recorder.record(1, 1, 12.0)
+        time.sleep(1.1)
+        recorder.record(1, 2, 13.0)
+        assert recorder.rows_written == 1
+    first, second = read_rows(path)
+    assert first['timestamp'] != second['timestamp']
+
+
+def test_idle_buffer_is_flushed_in_the_background(tmp_path):
+    path = str(tmp_path / 'flights.csv')
+    collector = PaperPlaneDataCollector()
+    with collector.stream_to_csv(path, flush_seconds=0.1, progress_seconds=3600) as recorder:
+        recorder.record(1, 1, 12.0)
+        deadline = time.monotonic() + 5
+        while recorder.rows_written == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(read_rows(path)) == 1
+
+
+def test_collector_dimensions_match_the_simulated_experiment(tmp_path):
+    columns = PaperPlaneDataCollector().simulate_experiment(1000, 1, seed=0)
+    collector = PaperPlaneDataCollector(n_sizes=1000)
+    collector.add_measurements(columns['size_rank'], columns['trial_number'], columns['distance_m'])
+    path = str(tmp_path / 'collected.csv')
+    collector.export_to_csv(path)
+
+    rows = read_rows(path)
+    assert [float(row['width_cm']) for row in rows] == columns['width_cm'].tolist()
+    assert min(float(row['width_cm']) for row in rows) > 0
@@ -0,0 +1,87 @@
+import csv
+import json
+
+import pytest
+
+from data_cleaning import incremental_flight_data, process_flight_data
+from flight_format import FIELDNAMES
+
+
+def write_raw(path, rows, mode='w'):
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(FIELDNAMES)
+        writer.writerows(rows)
+
+
+def raw_row(size_rank, trial_number, distance):
+    return [size_rank, 27.94, 21.59, 603.22, trial_number, distance, '2024-01-01 00:00:00', '']
+
+
+def read_processed(path):
+    merged = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f, restval=''):
+            entry = merged.setdefault(row['size_rank'], {'trials': []})
+            trials = sorted((k for k in row if k.startswith('trial_') and row[k] != ''), key=lambda k: int(k[6:]))
+            entry['trials'] += [float(row[k]) for k in trials]
+            entry.update({k: float(v) for k, v in row.items() if not k.startswith('trial_')})
+    return merged
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / 'raw.csv'
+    write_raw(path, [raw_row(1, t, 10.0 + t) for t in range(1, 6)] + [raw_row(2, t, 5.0 + t) for t in range(1, 6)])
+    return path
+
+
+def test_incremental_matches_full_rebuild_after_append(raw_file, tmp_path):
+    incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    write_raw(raw_file, [raw_row(1, 0, 3.0), raw_row(2, 6, 12.0)], mode='a')
+    incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    process_flight_data(str(raw_file), str(tmp_path / 'full.csv'))
+
+    assert read_processed(tmp_path / 'inc.csv') == read_processed(tmp_path / 'full.csv')
+
+
+def test_in_order_append_only_appends_rows(raw_file, tmp_path):
+    output = tmp_path / 'inc.csv'
+    incremental_flight_data(str(raw_file), str(output))
+    before = output.read_bytes()
+    write_raw(raw_file, [raw_row(1, 6, 3.0), raw_row(1, 7, 4.0), raw_row(2, 6, 12.0)], mode='a')
+    incremental_flight_data(str(raw_file), str(output))
+    process_flight_data(str(raw_file), str(tmp_path / 'full.csv'))
+
+    assert output.read_bytes().startswith(before)
+    assert read_processed(output) == read_processed(tmp_path / 'full.csv')
+    with open(str(output) + '.state.json', encoding='utf-8') as f:
+        assert json.load(f)['last_trial'] == {'1': 7, '2': 6}
+
+
+def test_incremental_rebuilds_after_in_place_rewrite(raw_file, tmp_path):
+    incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    with open(raw_file, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))[1:]
+    rows[0][5] = '99.0'
+    write_raw(raw_file, rows)
+    write_raw(raw_file, [raw_row(2, 6, 12.0)], mode='a')
+    incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    process_flight_data(str(raw_file), str(tmp_path / 'full.csv'))
+
+    incremental = read_processed(tmp_path / 'inc.csv')
+    assert incremental == read_processed(tmp_path / 'full.csv')
+    assert incremental['1']['trials'][0] == 99.0
+
+
+def test_incremental_ignores_partial_last_line(raw_file, tmp_path):
+    with open(raw_file, 'a', encoding='utf-8') as f:
+        f.write('1,27.94,21.59,603.22,6,1')
+    aggregates = incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    assert aggregates[1].count == 5
+    with open(raw_file, 'a', encoding='utf-8') as f:
+        f.write('6.0,2024-01-01 00:00:00,\n')
+    aggregates = incremental_flight_data(str(raw_file), str(tmp_path / 'inc.csv'))
+    assert aggregates[1].count == 6
+    assert aggregates[1].max == 16.0
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from matplotlib import cbook
+
+from data_cleaning import SizeAggregate, aggregate_shard
+from quantile_sketch import RESERVOIR_SIZE, QuantileSketch
+from test_statistics import DATA_FILE
+
+BOX_KEYS = ('mean', 'med', 'q1', 'q3', 'cilo', 'cihi', 'whislo', 'whishi')
+
+
+@pytest.mark.parametrize('values', [
+    np.append(np.round(np.arange(1.0, 1.63, 0.02), 2), 5.0),
+    np.random.default_rng(1).normal(10.0, 2.0, 10),
+    np.random.default_rng(2).lognormal(1.0, 0.8, RESERVOIR_SIZE),
+])
+def test_small_groups_match_matplotlib_box_stats(values):
+    stats = QuantileSketch().add_many(values).box_stats()
+    expected = cbook.boxplot_stats(values)[0]
+    for key in BOX_KEYS:
+        assert stats[key] == pytest.approx(expected[key]), key
+    assert sorted(stats['fliers']) == sorted(expected['fliers'])
+
+
+def test_whiskers_within_the_tails_are_observed_values():
+    values = np.random.default_rng(3).normal(10.0, 2.0, 2000)
+    stats = QuantileSketch().add_many(values, np.random.default_rng(0)).box_stats()
+    expected = cbook.boxplot_stats(values)[0]
+    for key in ('whislo', 'whishi'):
+        assert stats[key] in values
+        assert stats[key] == pytest.approx(expected[key], rel=0.01)
+
+
+def test_approximate_whiskers_stay_inside_the_fences():
+    values = np.random.default_rng(3).lognormal(1.0, 0.8, 20000)
+    stats = QuantileSketch().add_many(values, np.random.default_rng(0)).box_stats()
+    expected = cbook.boxplot_stats(values)[0]
+    assert stats['whislo'] == expected['whislo']
+    assert stats['whishi'] == pytest.approx(expected['whishi'], rel=0.01)
+    assert stats['whishi'] <= stats['q3'] + 1.5 * (stats['q3'] - stats['q1'])
+    assert not np.any(stats['fliers'] <= stats['whishi'])
+
+
+def test_merged_aggregate_does_not_alias_the_other_sketch():
+    first, second = SizeAggregate(1.0, 1.0, 1.0).track_quantiles(), SizeAggregate(1.0, 1.0, 1.0).track_quantiles()
+    second.add(2.0)
+    first.merge(second)
+    first.add(3.0)
+    first.flush()
+    assert first.sketch is not second.sketch
+    assert (first.sketch.count, second.sketch.count) == (2, 1)
+
+
+def test_row_wise_aggregates_carry_sketches():
+    _, aggregates = aggregate_shard(DATA_FILE)
+    for agg in aggregates.values():
+        assert agg.sketch.count == agg.count
+        assert not agg.pending
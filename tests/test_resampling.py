@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+from statistical_analysis import GroupIndex, PaperPlaneAnalysis, bootstrap_intervals, permutation_anova
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw_flight_data.csv')
+
+
+@pytest.fixture
+def group_index():
+    rng = np.random.default_rng(0)
+    sizes = np.repeat(np.arange(1, 6), 20)
+    return GroupIndex(sizes, 10.0 / sizes + rng.normal(0, 0.5, len(sizes)))
+
+
+def test_zero_resamples_are_rejected(group_index):
+    with pytest.raises(ValueError):
+        permutation_anova(group_index, 0, seed=1)
+    with pytest.raises(ValueError):
+        bootstrap_intervals(group_index, 0, seed=1)
+
+
+def test_resampling_step_is_skipped_without_resamples(tmp_path, capsys):
+    analysis = PaperPlaneAnalysis(DATA_FILE, workers=1, n_resamples=0, cache_dir=str(tmp_path))
+    analysis.run_steps(['resampling'])
+    assert analysis.results['resampling'] is None
+    assert 'Skipped' in capsys.readouterr().out
+
+
+def test_unseeded_resampling_is_not_cached(tmp_path):
+    analysis = PaperPlaneAnalysis(DATA_FILE, workers=1, n_resamples=20, seed=None, cache_dir=str(tmp_path))
+    analysis.run_steps(['resampling'])
+    assert not any(name.startswith('resampling_inference') for name in os.listdir(tmp_path))
+
+    seeded = PaperPlaneAnalysis(DATA_FILE, workers=1, n_resamples=20, seed=3, cache_dir=str(tmp_path))
+    seeded.run_steps(['resampling'])
+    assert any(name.startswith('resampling_inference') for name in os.listdir(tmp_path))
+
+
+def test_seeded_resampling_is_reproducible(group_index):
+    first = permutation_anova(group_index, 50, seed=np.random.SeedSequence(7), workers=1)
+    second = permutation_anova(group_index, 50, seed=np.random.SeedSequence(7), workers=1)
+    assert first == second
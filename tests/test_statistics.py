@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+
+from create_visualizations import VisualizationGenerator
+from flight_data import PLOT_COLUMNS
+from statistical_analysis import OutOfCoreAnalysis, PaperPlaneAnalysis, all_pairs_posthoc, pair_position
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw_flight_data.csv')
+
+
+def load(analysis):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analysis.load_data()
+    return analysis
+
+
+def test_generator_reuses_the_analysis_statistics(tmp_path):
+    analysis = load(PaperPlaneAnalysis(DATA_FILE, workers=1, columns=PLOT_COLUMNS))
+    generator = load(VisualizationGenerator(DATA_FILE, str(tmp_path), workers=1, stats=analysis.stats))
+
+    assert generator.stats is analysis.stats
+    assert generator.df is analysis.df
+    assert generator.figure_hash('plot_size_dimensions')
+
+
+def test_pair_test_matches_all_pairs_posthoc():
+    stats = load(PaperPlaneAnalysis(DATA_FILE, workers=1)).stats
+    posthoc = stats.posthoc
+    n_groups = len(stats.sizes)
+    for i, j in [(0, 1), (0, 14), (13, 14)]:
+        position = pair_position(n_groups, i, j)
+        t_stat, p_value, mean_diff = stats.pair_test(stats.sizes[i], stats.sizes[j])
+        assert np.isclose(t_stat, posthoc['t_stat'][position])
+        assert np.isclose(p_value, posthoc['p_value'][position])
+        assert np.isclose(mean_diff, posthoc['mean_diff'][position])
+
+
+def test_aggregate_statistics_report_dimensions():
+    in_memory = load(PaperPlaneAnalysis(DATA_FILE, workers=1, columns=PLOT_COLUMNS)).stats.dimensions
+    out_of_core = load(OutOfCoreAnalysis(DATA_FILE, workers=1)).stats.dimensions
+
+    assert list(out_of_core.index) == list(in_memory.index)
+    assert np.allclose(out_of_core.to_numpy(), in_memory.to_numpy())
+
+
+def test_single_throw_group_only_affects_its_own_pairs():
+    sizes = np.array([1, 2, 3, 4])
+    counts = np.array([10, 10, 1, 10])
+    means = np.array([10.0, 8.0, 5.0, 2.0])
+    variances = np.array([1.0, 1.0, np.nan, 1.0])
+    posthoc = all_pairs_posthoc(sizes, counts, means, variances)
+    with_single = np.array([2 in (i, j) for i, j in zip(*np.triu_indices(len(sizes), k=1))])
+
+    for key in ('p_value', 'p_holm', 'p_bh'):
+        assert np.isnan(posthoc[key][with_single]).all()
+        assert np.isfinite(posthoc[key][~with_single]).all()
+    assert np.isfinite(posthoc['q_stat']).all()
+    assert posthoc['reject_tukey'][~with_single].all()
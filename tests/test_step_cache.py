@@ -0,0 +1,38 @@
+import contextlib
+import io
+import os
+
+from statistical_analysis import SOURCE_MODULES, OutOfCoreAnalysis, PaperPlaneAnalysis
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw_flight_data.csv')
+
+
+def run(analysis, steps):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        analysis.run_steps(steps)
+    return output.getvalue()
+
+
+def test_out_of_core_and_in_memory_runs_do_not_share_cache_entries(tmp_path):
+    steps = ['load_data', 'check_assumptions']
+    out_of_core = run(OutOfCoreAnalysis(DATA_FILE, workers=1, cache_dir=str(tmp_path)), steps)
+    analysis = PaperPlaneAnalysis(DATA_FILE, workers=1, cache_dir=str(tmp_path))
+    in_memory = run(analysis, steps)
+
+    assert out_of_core != in_memory
+    assert 'OUT-OF-CORE' not in in_memory
+    assert 'Skipped' not in in_memory
+    assert analysis.results['assumptions'] is not None
+
+
+def test_cached_rerun_replays_the_same_output(tmp_path):
+    steps = ['descriptive_statistics', 'one_way_anova']
+    first = run(PaperPlaneAnalysis(DATA_FILE, workers=1, cache_dir=str(tmp_path)), steps)
+    second = run(PaperPlaneAnalysis(DATA_FILE, workers=1, cache_dir=str(tmp_path)), steps)
+    assert first == second
+
+
+def test_cache_key_covers_the_modules_results_depend_on():
+    assert {'statistical_analysis', 'flight_data', 'flight_format', 'data_cleaning',
+            'quantile_sketch'} <= set(SOURCE_MODULES)